@@ -0,0 +1,37 @@
+"""add consumed refresh tokens
+
+Revision ID: 3b7c1e9a4d52
+Revises: ef1d775276c0
+Create Date: 2026-10-19 09:12:44.201532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7c1e9a4d52'
+down_revision: Union[str, None] = 'ef1d775276c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('consumed_refresh_tokens',
+    sa.Column('jti', sa.String(length=64), nullable=False),
+    sa.Column('family_id', sa.String(length=64), nullable=False),
+    sa.Column('family_revoked', sa.Boolean(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index(op.f('ix_consumed_refresh_tokens_family_id'), 'consumed_refresh_tokens', ['family_id'], unique=False)
+    op.create_index(op.f('ix_consumed_refresh_tokens_expires_at'), 'consumed_refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_consumed_refresh_tokens_expires_at'), table_name='consumed_refresh_tokens')
+    op.drop_index(op.f('ix_consumed_refresh_tokens_family_id'), table_name='consumed_refresh_tokens')
+    op.drop_table('consumed_refresh_tokens')
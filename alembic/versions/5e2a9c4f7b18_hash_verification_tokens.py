@@ -0,0 +1,39 @@
+"""hash verification tokens
+
+Revision ID: 5e2a9c4f7b18
+Revises: 3b7c1e9a4d52
+Create Date: 2026-10-19 14:03:27.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9c4f7b18'
+down_revision: Union[str, None] = '3b7c1e9a4d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('verification_token_hash', sa.String(length=64), nullable=True))
+    op.add_column('users', sa.Column('verification_token_expires_at', sa.DateTime(timezone=True), nullable=True))
+    # Pending links already sent keep working: their tokens are hashed in place, without an expiry.
+    op.execute(
+        "UPDATE users SET verification_token_hash = encode(sha256(convert_to(verification_token, 'UTF8')), 'hex') "
+        "WHERE verification_token IS NOT NULL"
+    )
+    op.create_index('ix_users_verification_token_hash', 'users', ['verification_token_hash'], unique=False,
+                    postgresql_where=sa.text('verification_token_hash IS NOT NULL'))
+    op.drop_column('users', 'verification_token')
+
+
+def downgrade() -> None:
+    # Plain tokens cannot be recovered from their hashes, so pending verifications are lost.
+    op.add_column('users', sa.Column('verification_token', sa.String(), nullable=True))
+    op.drop_index('ix_users_verification_token_hash', table_name='users')
+    op.drop_column('users', 'verification_token_expires_at')
+    op.drop_column('users', 'verification_token_hash')
@@ -0,0 +1,33 @@
+"""lockout expiry
+
+Revision ID: 8c4d2b7e1f93
+Revises: 5e2a9c4f7b18
+Create Date: 2026-10-19 15:21:09.834117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4d2b7e1f93'
+down_revision: Union[str, None] = '5e2a9c4f7b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('users', sa.Column('lockout_count', sa.Integer(), server_default='0', nullable=False))
+    # Accounts locked so far stay locked until an admin unlocks them, as before.
+    op.execute("UPDATE users SET locked_until = '9999-12-31 00:00:00+00', lockout_count = 1 WHERE is_locked")
+    op.drop_column('users', 'is_locked')
+
+
+def downgrade() -> None:
+    op.add_column('users', sa.Column('is_locked', sa.Boolean(), nullable=True))
+    op.execute("UPDATE users SET is_locked = coalesce(locked_until > now(), false)")
+    op.drop_column('users', 'lockout_count')
+    op.drop_column('users', 'locked_until')
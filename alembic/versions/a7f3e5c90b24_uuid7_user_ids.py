@@ -0,0 +1,43 @@
+"""uuid7 user ids
+
+Revision ID: a7f3e5c90b24
+Revises: 8c4d2b7e1f93
+Create Date: 2026-10-19 16:02:51.207388
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7f3e5c90b24'
+down_revision: Union[str, None] = '8c4d2b7e1f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The application generates UUIDv7 ids itself (app/utils/uuid7.py). This server default gives
+    # rows inserted outside the application time-ordered ids too. Existing random ids are left as
+    # they are; they remain valid keys, they just don't follow creation order.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+            -- Overwrite the first 48 bits of a random UUID with the Unix time in milliseconds,
+            -- then turn the version nibble from 4 (0100) into 7 (0111).
+            SELECT encode(
+                set_bit(set_bit(
+                    overlay(uuid_send(gen_random_uuid())
+                            placing substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                            FROM 1 FOR 6),
+                    52, 1), 53, 1),
+                'hex')::uuid
+        $$ LANGUAGE sql VOLATILE
+    """)
+    op.alter_column('users', 'id', server_default=sa.text('uuid_generate_v7()'))
+
+
+def downgrade() -> None:
+    op.alter_column('users', 'id', server_default=None)
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
@@ -0,0 +1,33 @@
+"""lowercase emails
+
+Revision ID: c2e8f1a4d6b3
+Revises: a7f3e5c90b24
+Create Date: 2026-10-19 16:48:30.660214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8f1a4d6b3'
+down_revision: Union[str, None] = 'a7f3e5c90b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lowercasing would merge accounts whose emails differ only by case; those need a person to decide.
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT lower(email) FROM users GROUP BY lower(email) HAVING count(*) > 1"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"Resolve accounts whose emails differ only by case before upgrading: {', '.join(duplicates)}")
+    op.execute("UPDATE users SET email = lower(email) WHERE email <> lower(email)")
+    op.create_check_constraint('ck_users_email_lowercase', 'users', 'email = lower(email)')
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_users_email_lowercase', 'users', type_='check')
@@ -0,0 +1,55 @@
+"""split user profiles
+
+Revision ID: d5b1a8e3c7f2
+Revises: c2e8f1a4d6b3
+Create Date: 2026-10-19 17:30:12.449871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b1a8e3c7f2'
+down_revision: Union[str, None] = 'c2e8f1a4d6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PROFILE_COLUMNS = "first_name, last_name, bio, profile_picture_url, linkedin_profile_url, github_profile_url"
+
+
+def upgrade() -> None:
+    op.create_table('user_profiles',
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('first_name', sa.String(length=100), nullable=True),
+    sa.Column('last_name', sa.String(length=100), nullable=True),
+    sa.Column('bio', sa.String(length=500), nullable=True),
+    sa.Column('profile_picture_url', sa.String(length=255), nullable=True),
+    sa.Column('linkedin_profile_url', sa.String(length=255), nullable=True),
+    sa.Column('github_profile_url', sa.String(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Only users with some profile data get a row.
+    op.execute(
+        f"INSERT INTO user_profiles (user_id, {PROFILE_COLUMNS}) SELECT id, {PROFILE_COLUMNS} FROM users "
+        f"WHERE COALESCE({PROFILE_COLUMNS}) IS NOT NULL"
+    )
+    for column in PROFILE_COLUMNS.split(", "):
+        op.drop_column('users', column)
+
+
+def downgrade() -> None:
+    op.add_column('users', sa.Column('first_name', sa.String(length=100), nullable=True))
+    op.add_column('users', sa.Column('last_name', sa.String(length=100), nullable=True))
+    op.add_column('users', sa.Column('bio', sa.String(length=500), nullable=True))
+    op.add_column('users', sa.Column('profile_picture_url', sa.String(length=255), nullable=True))
+    op.add_column('users', sa.Column('linkedin_profile_url', sa.String(length=255), nullable=True))
+    op.add_column('users', sa.Column('github_profile_url', sa.String(length=255), nullable=True))
+    op.execute(
+        f"UPDATE users SET ({PROFILE_COLUMNS}) = (SELECT {PROFILE_COLUMNS} FROM user_profiles WHERE user_profiles.user_id = users.id)"
+    )
+    op.drop_table('user_profiles')
@@ -0,0 +1,41 @@
+"""covering user indexes
+
+Revision ID: e9c4a2f6b8d1
+Revises: d5b1a8e3c7f2
+Create Date: 2026-10-19 18:05:41.270318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c4a2f6b8d1'
+down_revision: Union[str, None] = 'd5b1a8e3c7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOGIN_COLUMNS = "id, hashed_password, locked_until, email_verified, failed_login_attempts, lockout_count, role"
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction, and keeps users writable while the indexes build.
+    # A failed concurrent build leaves an INVALID index behind: drop it and run the upgrade again.
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_covering")
+        op.execute(f"CREATE UNIQUE INDEX CONCURRENTLY ix_users_email_covering ON users (email) INCLUDE ({LOGIN_COLUMNS})")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email")
+        op.execute("ALTER INDEX ix_users_email_covering RENAME TO ix_users_email")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_locked_until ON users (locked_until) WHERE locked_until IS NOT NULL")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_unverified_created_at ON users (created_at) WHERE NOT email_verified")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_unverified_created_at")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_locked_until")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_plain")
+        op.execute("CREATE UNIQUE INDEX CONCURRENTLY ix_users_email_plain ON users (email)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email")
+        op.execute("ALTER INDEX ix_users_email_plain RENAME TO ix_users_email")
@@ -0,0 +1,46 @@
+"""user stats views
+
+Revision ID: f3a7d9c1e5b2
+Revises: e9c4a2f6b8d1
+Create Date: 2026-10-19 18:42:17.905362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7d9c1e5b2'
+down_revision: Union[str, None] = 'e9c4a2f6b8d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE MATERIALIZED VIEW user_stats AS
+        SELECT role,
+               email_verified,
+               coalesce(locked_until > now(), false) AS is_locked,
+               coalesce(is_professional, false) AS is_professional,
+               count(*)::integer AS users,
+               now() AS refreshed_at
+        FROM users
+        GROUP BY 1, 2, 3, 4
+    """)
+    # REFRESH MATERIALIZED VIEW CONCURRENTLY needs a unique index over all rows.
+    op.execute("CREATE UNIQUE INDEX ix_user_stats_key ON user_stats (role, email_verified, is_locked, is_professional)")
+    op.execute("""
+        CREATE MATERIALIZED VIEW user_signups_daily AS
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS day, count(*)::integer AS users
+        FROM users
+        WHERE created_at IS NOT NULL
+        GROUP BY 1
+    """)
+    op.execute("CREATE UNIQUE INDEX ix_user_signups_daily_day ON user_signups_daily (day)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS user_signups_daily")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS user_stats")
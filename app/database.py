@@ -1,22 +1,62 @@
+import asyncio
+from builtins import int, range
+from typing import Optional
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.sql.functions import now
+from app.utils.metrics import instrument_engine
+from app.utils.query_instrumentation import instrument_queries
 
 Base = declarative_base()
 
+@compiles(now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    # SQLAlchemy stores SQLite datetimes as text with six fractional digits. CURRENT_TIMESTAMP has
+    # none, so a timestamp written by the database would never equal the same instant bound from
+    # Python (the If-Match check compares updated_at that way). SQLite's clock has millisecond precision.
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
 class Database:
     """Handles database connections and sessions."""
     _engine = None
     _session_factory = None
 
     @classmethod
-    def initialize(cls, database_url: str, echo: bool = False):
+    def initialize(cls, database_url: str, echo: bool = False, slow_query_threshold_ms: Optional[int] = None):
         """Initialize the async engine and sessionmaker."""
         if cls._engine is None:  # Ensure engine is created once
             cls._engine = create_async_engine(database_url, echo=echo, future=True)
+            instrument_engine(cls._engine)
+            if slow_query_threshold_ms is not None:
+                instrument_queries(cls._engine, slow_query_threshold_ms)
             cls._session_factory = sessionmaker(
                 bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
             )
 
+    @classmethod
+    async def warm_up(cls, connections: int):
+        """Open pooled connections concurrently so the first requests skip the connection handshake."""
+        async def ping():
+            async with cls._engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        await asyncio.gather(*(ping() for _ in range(connections)))
+
+    @classmethod
+    async def dispose(cls):
+        """Close the pooled connections; the engine reconnects on next use."""
+        if cls._engine is not None:
+            await cls._engine.dispose()
+
+    @classmethod
+    def reset_after_fork(cls):
+        """Forget an engine inherited from a parent process without closing the parent's connections."""
+        if cls._engine is not None:
+            cls._engine.sync_engine.dispose(close=False)
+        cls._engine = None
+        cls._session_factory = None
+
     @classmethod
     def get_session_factory(cls):
         """Returns the session factory, ensuring it's initialized."""
@@ -36,7 +36,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     payload = decode_token(token)
-    if payload is None:
+    if payload is None or payload.get("type") == "refresh":
         raise credentials_exception
     user_id: str = payload.get("sub")
     user_role: str = payload.get("role")
@@ -1,10 +1,43 @@
 from builtins import Exception
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.responses import JSONResponse
 from app.database import Database
 from app.dependencies import get_settings
-from app.routers import user_routes
+from app.routers import system_routes, user_routes
+from app.services.jwt_service import get_signing_keys
+from app.services.maintenance_service import MaintenanceService
 from app.utils.api_description import getDescription
+from app.utils.metrics import MetricsMiddleware
+from app.utils.query_instrumentation import QueryTrackingMiddleware
+from app.utils.rate_limiter import RateLimitMiddleware
+from app.utils.template_manager import TemplateManager
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the engine in each worker, then warm the connection pool, the email template cache and
+    the JWT keys before reporting ready, so the first requests after a deploy don't pay for them.
+    The maintenance scheduler also starts in every worker; only the elected one runs the jobs.
+    """
+    app.state.ready = False
+    settings = get_settings()
+    Database.initialize(settings.database_url, settings.debug, settings.slow_query_threshold_ms)
+    await Database.warm_up(settings.db_warmup_connections)
+    TemplateManager.warm_up()
+    get_signing_keys()
+    scheduler = None
+    if settings.maintenance_enabled:
+        scheduler = MaintenanceService.build_scheduler(Database._engine, Database.get_session_factory(), settings)
+        scheduler.start()
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    if scheduler is not None:
+        await scheduler.stop()
+    await Database.dispose()
+
 app = FastAPI(
     title="User Management",
     description=getDescription(),
@@ -15,17 +48,17 @@ app = FastAPI(
         "email": "support@example.com",
     },
     license_info={"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
+    lifespan=lifespan,
 )
 
-@app.on_event("startup")
-async def startup_event():
-    settings = get_settings()
-    Database.initialize(settings.database_url, settings.debug)
-
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
 
-app.include_router(user_routes.router)
-
+app.add_middleware(GZipMiddleware, minimum_size=get_settings().gzip_minimum_size)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(QueryTrackingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
+app.include_router(user_routes.router)
+app.include_router(system_routes.router)
@@ -0,0 +1,31 @@
+from builtins import bool, str
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, String, func
+from sqlalchemy.orm import Mapped
+from app.database import Base
+
+class ConsumedRefreshToken(Base):
+    """
+    Records refresh tokens that have already been exchanged, keyed by their JTI.
+
+    Refresh tokens are stateless when issued, so login does not write here. A row is inserted
+    the first time a token is rotated; presenting the same JTI again hits the primary key and is
+    treated as token reuse, which revokes every token in the same family.
+
+    Attributes:
+        jti (str): Unique identifier of the consumed refresh token.
+        family_id (str): Identifier shared by all tokens rotated from the same login.
+        family_revoked (bool): Set on every row of a family once reuse has been detected.
+        expires_at (datetime): Expiry of the consumed token; rows past it can be purged.
+        created_at (datetime): Timestamp when the token was consumed.
+    """
+    __tablename__ = "consumed_refresh_tokens"
+
+    jti: Mapped[str] = Column(String(64), primary_key=True)
+    family_id: Mapped[str] = Column(String(64), nullable=False, index=True)
+    family_revoked: Mapped[bool] = Column(Boolean, default=False, nullable=False)
+    expires_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<ConsumedRefreshToken {self.jti}, Family: {self.family_id}>"
@@ -1,13 +1,38 @@
 from builtins import bool, int, str
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 import uuid
 from sqlalchemy import (
-    Column, String, Integer, DateTime, Boolean, func, Enum as SQLAlchemyEnum
+    CheckConstraint, Column, String, Integer, DateTime, Boolean, Index, false, func, text, Enum as SQLAlchemyEnum
 )
 from sqlalchemy.dialects.postgresql import UUID, ENUM
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.functions import FunctionElement
 from app.database import Base
+from app.models.user_profile_model import UserProfile
+from app.utils.uuid7 import uuid7
+
+class utcnow(FunctionElement):
+    """
+    The database clock at the time the statement runs. now() is fixed for the whole transaction,
+    so two updates in one transaction would leave updated_at, and the ETag derived from it, unchanged.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return compiler.process(func.now(), **kw)
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "clock_timestamp()"
+
+# locked_until for accounts locked until an admin unlocks them.
+LOCKED_INDEFINITELY = datetime(9999, 12, 31, tzinfo=timezone.utc)
 
 class UserRole(Enum):
     """Enumeration of user roles within the application, stored as ENUM in the database."""
@@ -22,26 +47,27 @@ class User(Base):
     This class uses SQLAlchemy ORM for mapping attributes to database columns efficiently.
     
     Attributes:
-        id (UUID): Unique identifier for the user.
+        id (UUID): Unique identifier for the user, time-ordered (UUIDv7).
         nickname (str): Unique nickname for privacy, required.
-        email (str): Unique email address, required.
+        email (str): Unique email address, required, stored lowercased.
         email_verified (bool): Flag indicating if the email has been verified.
         hashed_password (str): Hashed password for security, required.
-        first_name (str): Optional first name of the user.
-        last_name (str): Optional first name of the user.
-
-        bio (str): Optional biographical information.
-        profile_picture_url (str): Optional URL to a profile picture.
-        linkedin_profile_url (str): Optional LinkedIn profile URL.
-        github_profile_url (str): Optional GitHub profile URL.
+        profile (UserProfile): Names, bio and profile URLs, stored in ``user_profiles``. Never loaded
+            implicitly: query with ``joinedload``/``selectinload(User.profile)`` where it is needed.
+        first_name, last_name, bio, profile_picture_url, linkedin_profile_url, github_profile_url:
+            Read and write the matching ``profile`` field, creating the profile on first write.
         role (UserRole): Role of the user within the application.
         is_professional (bool): Flag indicating professional status.
         professional_status_updated_at (datetime): Timestamp of last professional status update.
         last_login_at (datetime): Timestamp of the last login.
-        failed_login_attempts (int): Count of failed login attempts.
-        is_locked (bool): Flag indicating if the account is locked.
+        failed_login_attempts (int): Count of failed login attempts since the last lockout or login.
+        locked_until (datetime): End of the current lockout, if any.
+        lockout_count (int): Consecutive lockouts since the last successful login, for the backoff.
+        is_locked (bool): Whether the account is locked now, derived from locked_until.
         created_at (datetime): Timestamp when the user was created, set by the server.
         updated_at (datetime): Timestamp of the last update, set by the server.
+        verification_token_hash (str): SHA-256 of the pending email verification token.
+        verification_token_expires_at (datetime): When the pending verification token stops being accepted.
 
     Methods:
         lock_account(): Locks the user account.
@@ -53,32 +79,95 @@ class User(Base):
     __tablename__ = "users"
     __mapper_args__ = {"eager_defaults": True}
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     nickname: Mapped[str] = Column(String(50), unique=True, nullable=False, index=True)
-    email: Mapped[str] = Column(String(255), unique=True, nullable=False, index=True)
-    first_name: Mapped[str] = Column(String(100), nullable=True)
-    last_name: Mapped[str] = Column(String(100), nullable=True)
-    bio: Mapped[str] = Column(String(500), nullable=True)
-    profile_picture_url: Mapped[str] = Column(String(255), nullable=True)
-    linkedin_profile_url: Mapped[str] = Column(String(255), nullable=True)
-    github_profile_url: Mapped[str] = Column(String(255), nullable=True)
+    email: Mapped[str] = Column(String(255), nullable=False)  # Unique through ix_users_email below
     role: Mapped[UserRole] = Column(SQLAlchemyEnum(UserRole, name='UserRole', create_constraint=False), default=UserRole.ANONYMOUS, nullable=False)
     is_professional: Mapped[bool] = Column(Boolean, default=False)
     professional_status_updated_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
     last_login_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
     failed_login_attempts: Mapped[int] = Column(Integer, default=0)
-    is_locked: Mapped[bool] = Column(Boolean, default=False)
+    locked_until: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    lockout_count: Mapped[int] = Column(Integer, default=0, server_default="0", nullable=False)
     created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    verification_token = Column(String, nullable=True)
+    updated_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), onupdate=utcnow())
+    verification_token_hash: Mapped[str] = Column(String(64), nullable=True)
+    verification_token_expires_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
     email_verified: Mapped[bool] = Column(Boolean, default=False, nullable=False)
     hashed_password: Mapped[str] = Column(String(255), nullable=False)
 
+    __table_args__ = (
+        # Emails are normalized before every write and lookup (normalize_email), so the plain unique
+        # index on email is case-insensitive; the constraint keeps rows written any other way honest.
+        CheckConstraint("email = lower(email)", name="ck_users_email_lowercase"),
+        # Covers every column the login query reads, so a login is an index-only scan on PostgreSQL.
+        Index(
+            "ix_users_email", "email", unique=True,
+            postgresql_include=["id", "hashed_password", "locked_until", "email_verified", "failed_login_attempts", "lockout_count", "role"],
+        ),
+        # Few accounts are locked or unverified at any time; these stay small and serve the admin
+        # filters and the purge of unverified accounts.
+        Index(
+            "ix_users_locked_until", "locked_until",
+            postgresql_where=text("locked_until IS NOT NULL"), sqlite_where=text("locked_until IS NOT NULL"),
+        ),
+        Index(
+            "ix_users_unverified_created_at", "created_at",
+            postgresql_where=text("NOT email_verified"), sqlite_where=text("NOT email_verified"),
+        ),
+        # Only pending verifications are indexed, so the index stays small however many users verify.
+        Index(
+            "ix_users_verification_token_hash", "verification_token_hash",
+            postgresql_where=verification_token_hash.isnot(None),
+            sqlite_where=verification_token_hash.isnot(None),
+        ),
+    )
+
+    # The plain verification token is never stored. It is only held in memory after it is issued,
+    # so it can be put in the verification email.
+    verification_token = None
+
+    # lazy="raise": auth paths must never pull the profile in by accident.
+    profile: Mapped[UserProfile] = relationship(
+        UserProfile, uselist=False, lazy="raise", cascade="all, delete-orphan", passive_deletes=True
+    )
+    first_name = association_proxy("profile", "first_name", creator=lambda value: UserProfile(first_name=value))
+    last_name = association_proxy("profile", "last_name", creator=lambda value: UserProfile(last_name=value))
+    bio = association_proxy("profile", "bio", creator=lambda value: UserProfile(bio=value))
+    profile_picture_url = association_proxy("profile", "profile_picture_url", creator=lambda value: UserProfile(profile_picture_url=value))
+    linkedin_profile_url = association_proxy("profile", "linkedin_profile_url", creator=lambda value: UserProfile(linkedin_profile_url=value))
+    github_profile_url = association_proxy("profile", "github_profile_url", creator=lambda value: UserProfile(github_profile_url=value))
+
+
+    def __init__(self, **kwargs):
+        # A new user starts with a known, empty profile, so reading a profile field never tries to load one.
+        self.profile = None
+        super().__init__(**kwargs)
 
     def __repr__(self) -> str:
         """Provides a readable representation of a user object."""
         return f"<User {self.nickname}, Role: {self.role.name}>"
 
+    @hybrid_property
+    def is_locked(self) -> bool:
+        if self.locked_until is None:
+            return False
+        locked_until = self.locked_until
+        if locked_until.tzinfo is None:  # SQLite returns naive UTC timestamps
+            locked_until = locked_until.replace(tzinfo=timezone.utc)
+        return locked_until > datetime.now(timezone.utc)
+
+    @is_locked.inplace.setter
+    def _is_locked_setter(self, locked: bool):
+        # Setting the flag directly locks until an admin unlocks, as the column used to.
+        self.locked_until = LOCKED_INDEFINITELY if locked else None
+
+    @is_locked.inplace.expression
+    @classmethod
+    def _is_locked_expression(cls):
+        # Evaluated each time the attribute is used in a query, so "now" is the query's build time.
+        return func.coalesce(cls.locked_until > datetime.now(timezone.utc), false()).label("is_locked")
+
     def lock_account(self):
         self.is_locked = True
 
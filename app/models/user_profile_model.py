@@ -0,0 +1,38 @@
+from builtins import str
+import uuid
+from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped
+from app.database import Base
+
+class UserProfile(Base):
+    """
+    Public profile of a user, kept apart from the ``users`` row.
+
+    Login, token and lockout checks read ``users`` on every request. The wide, rarely used
+    profile columns live in this table, one row per user, so those checks stay on a narrow row.
+    A user may have no profile row, in which case every field reads as None.
+
+    Attributes:
+        user_id (UUID): The user this profile belongs to; deleted with the user.
+        first_name (str): Optional first name of the user.
+        last_name (str): Optional last name of the user.
+        bio (str): Optional biographical information.
+        profile_picture_url (str): Optional URL to a profile picture.
+        linkedin_profile_url (str): Optional LinkedIn profile URL.
+        github_profile_url (str): Optional GitHub profile URL.
+    """
+    __tablename__ = "user_profiles"
+
+    user_id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    first_name: Mapped[str] = Column(String(100), nullable=True)
+    last_name: Mapped[str] = Column(String(100), nullable=True)
+    bio: Mapped[str] = Column(String(500), nullable=True)
+    profile_picture_url: Mapped[str] = Column(String(255), nullable=True)
+    linkedin_profile_url: Mapped[str] = Column(String(255), nullable=True)
+    github_profile_url: Mapped[str] = Column(String(255), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<UserProfile {self.user_id}>"
+
+PROFILE_FIELDS = ("first_name", "last_name", "bio", "profile_picture_url", "linkedin_profile_url", "github_profile_url")
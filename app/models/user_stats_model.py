@@ -0,0 +1,77 @@
+"""
+Materialized views that summarize the users table for dashboards.
+
+``user_stats`` holds one row per combination of role, verified, locked and professional flags,
+at most a few dozen rows however many users there are. ``user_signups_daily`` holds one row per
+UTC day with signups. Both are refreshed by the ``refresh_user_stats`` maintenance job, so reads
+are a scan of a tiny view instead of an aggregate over ``users``; they lag writes by up to the
+refresh interval. Each view has a unique index so it can be refreshed CONCURRENTLY, without
+blocking readers.
+
+The views exist on PostgreSQL only; other databases compute the same rows from ``users``.
+"""
+from datetime import date
+from sqlalchemy import DDL, Boolean, Date, DateTime, Integer, column, event, func, select, table
+from app.models.user_model import User
+
+USER_STATS_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS user_stats AS
+SELECT role,
+       email_verified,
+       coalesce(locked_until > now(), false) AS is_locked,
+       coalesce(is_professional, false) AS is_professional,
+       count(*)::integer AS users,
+       now() AS refreshed_at
+FROM users
+GROUP BY 1, 2, 3, 4
+"""
+
+USER_SIGNUPS_DAILY_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS user_signups_daily AS
+SELECT (created_at AT TIME ZONE 'UTC')::date AS day, count(*)::integer AS users
+FROM users
+WHERE created_at IS NOT NULL
+GROUP BY 1
+"""
+
+USER_STATS_INDEX_SQL = "CREATE UNIQUE INDEX IF NOT EXISTS ix_user_stats_key ON user_stats (role, email_verified, is_locked, is_professional)"
+USER_SIGNUPS_DAILY_INDEX_SQL = "CREATE UNIQUE INDEX IF NOT EXISTS ix_user_signups_daily_day ON user_signups_daily (day)"
+
+user_stats = table(
+    "user_stats",
+    column("role", User.role.type),
+    column("email_verified", Boolean),
+    column("is_locked", Boolean),
+    column("is_professional", Boolean),
+    column("users", Integer),
+    column("refreshed_at", DateTime(timezone=True)),
+)
+
+user_signups_daily = table("user_signups_daily", column("day", Date), column("users", Integer))
+
+MATERIALIZED_VIEWS = ["user_stats", "user_signups_daily"]
+
+def live_user_stats_query():
+    """The rows of ``user_stats``, computed from ``users`` at query time."""
+    is_locked = User.is_locked.expression
+    is_professional = func.coalesce(User.is_professional, False)
+    return select(
+        User.role.label("role"),
+        User.email_verified.label("email_verified"),
+        is_locked.label("is_locked"),
+        is_professional.label("is_professional"),
+        func.count().label("users"),
+        func.now().label("refreshed_at"),
+    ).group_by(User.role, User.email_verified, is_locked, is_professional)
+
+def live_user_signups_daily_query(since: date):
+    """The rows of ``user_signups_daily`` from ``since`` on, computed from ``users`` at query time."""
+    day = func.date(User.created_at)
+    return select(day.label("day"), func.count().label("users")).where(day >= since.isoformat()).group_by(day).order_by(day)
+
+# Keep the views in step with ``Base.metadata.create_all`` and ``drop_all`` (tests, load benchmarks);
+# deployed databases get them from the Alembic migration.
+for statement in (USER_STATS_SQL, USER_STATS_INDEX_SQL, USER_SIGNUPS_DAILY_SQL, USER_SIGNUPS_DAILY_INDEX_SQL):
+    event.listen(User.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for name in MATERIALIZED_VIEWS:
+    event.listen(User.__table__, "before_drop", DDL(f"DROP MATERIALIZED VIEW IF EXISTS {name}").execute_if(dialect="postgresql"))
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Request, Response, status
+from starlette.responses import JSONResponse
+from app.utils.metrics import render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+@router.get("/healthz", tags=["Health"])
+async def healthz():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@router.get("/readyz", tags=["Health"])
+async def readyz(request: Request):
+    """Readiness probe: startup warm-up has finished and the instance can take traffic."""
+    if getattr(request.app.state, "ready", False):
+        return {"status": "ready"}
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "starting"})
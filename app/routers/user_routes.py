@@ -19,28 +19,65 @@ Key Highlights:
 """
 
 from builtins import dict, int, len, str
-from datetime import timedelta
 from uuid import UUID
 
 from pydantic import ValidationError
 from app.models.user_model import UserRole
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies import get_current_user, get_db, get_email_service, require_role
 from app.schemas.pagination_schema import EnhancedPagination
-from app.schemas.token_schema import TokenResponse
-from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
+from app.schemas.token_schema import RefreshTokenRequest, TokenResponse
+from app.schemas.user_schemas import LoginRequest, UserBase, UserBatchGetItem, UserBatchGetRequest, UserBatchGetResponse, UserBulkResult, UserBulkRoleChange, UserBulkSelection, UserCreate, UserListResponse, UserResponse, UserStatsResponse, UserUpdate
 from app.services.user_service import UserService
-from app.services.jwt_service import create_access_token
-from app.utils.link_generation import create_user_links, generate_pagination_links
-from app.dependencies import get_settings
+from app.services.jwt_service import get_jwks
+from app.services.token_service import TokenService
+from app.utils.etag import etag_matches, parse_user_etag, user_etag
+from app.utils.link_generation import create_user_links, generate_pagination_links, user_links_builder
+from settings.config import settings
 from app.services.email_service import EmailService
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
-settings = get_settings()
+@router.post("/users/batch-get", response_model=UserBatchGetResponse, name="batch_get_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def batch_get_users(batch: UserBatchGetRequest, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+    """
+    Fetch many users by id in a single query.
+
+    Items come back in request order, one per requested id (duplicates included); ids that do not
+    exist are returned with ``found: false`` instead of failing the whole request.
+    """
+    if len(batch.ids) > settings.batch_get_max_ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.batch_get_max_ids} ids can be fetched at once"
+        )
+    users = await UserService.get_by_ids(db, batch.ids)
+    build_links = user_links_builder(request)
+    items = []
+    for user_id in batch.ids:
+        user = users.get(user_id)
+        if user is None:
+            items.append(UserBatchGetItem(id=user_id, found=False))
+        else:
+            items.append(UserBatchGetItem(id=user_id, found=True, user=UserResponse.model_validate(user), links=build_links(user_id)))
+    return UserBatchGetResponse(items=items)
+
+@router.get("/users/stats", response_model=UserStatsResponse, name="user_stats", tags=["User Management Requires (Admin or Manager Roles)"])
+async def user_stats(days: int = Query(30, ge=1, le=366), db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+    """
+    User counts by role, verified, locked and professional status, and signups per day for the last `days` days.
+
+    The counts are recomputed every few minutes by a maintenance job rather than on each request,
+    so this answers in the same time at any table size; `refreshed_at` tells how current they are.
+    `locked` is evaluated at refresh time too: a lockout that expires after `refreshed_at` is still
+    counted as locked until the next refresh, up to `USER_STATS_REFRESH_INTERVAL_MINUTES` (5 by default).
+    """
+    return UserStatsResponse(**await UserService.stats(db, days))
+
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, response: Response, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Endpoint to fetch a user by their unique identifier (UUID).
 
@@ -52,11 +89,18 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
         request: The request object, used to generate full URLs in the response.
         db: Dependency that provides an AsyncSession for database access.
         token: The OAuth2 access token obtained through OAuth2PasswordBearer dependency.
+
+    Responses carry a strong ETag; a matching ``If-None-Match`` returns 304 without a body.
     """
-    user = await UserService.get_by_id(db, user_id)
+    user = await UserService.get_by_id(db, user_id, with_profile=True)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
+    etag = user_etag(user.id, user.updated_at)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     return UserResponse.model_construct(
         id=user.id,
         nickname=user.nickname,
@@ -82,20 +126,29 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
 # experience by adhering to REST principles and providing self-discoverable operations.
 
 @router.put("/users/{user_id}", response_model=UserResponse, name="update_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, response: Response, if_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Update user information.
 
     - **user_id**: UUID of the user to update.
     - **user_update**: UserUpdate model with updated user information.
+    - **If-Match** (header): ETag from a previous read; the update fails with 412 if the user changed since.
     """
     user_data = user_update.model_dump(exclude_unset=True)
+    expected_updated_at = None
+    if if_match and if_match.strip() != "*":
+        # The ETag encodes updated_at, so the check happens in the UPDATE itself, with no extra read.
+        parsed = parse_user_etag(if_match)
+        if parsed is None or parsed[0] != user_id:
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User was modified by another request")
+        expected_updated_at = parsed[1]
     try:
-        updated_user = await UserService.update(db, user_id, user_data)
+        updated_user = await UserService.update(db, user_id, user_data, expected_updated_at=expected_updated_at)
     except ValidationError as e:
         print(f"Validation Error: {e}")
     if not updated_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    response.headers["ETag"] = user_etag(updated_user.id, updated_user.updated_at)
 
     return UserResponse.model_construct(
         id=updated_user.id,
@@ -128,6 +181,36 @@ async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db), token:
 
 
 
+@router.post("/users/bulk/role", response_model=UserBulkResult, name="bulk_change_role", tags=["User Management Requires (Admin or Manager Roles)"])
+async def bulk_change_role(change: UserBulkRoleChange, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Change the role of every selected user.
+
+    Select users with either **ids** or a **filter**; users are updated in chunks of
+    ``BULK_CHUNK_SIZE`` and only those whose role actually changed are reported.
+    """
+    ids = await UserService.bulk_change_role(db, change, change.role)
+    return UserBulkResult(affected=len(ids), ids=ids)
+
+@router.post("/users/bulk/lock", response_model=UserBulkResult, name="bulk_lock_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def bulk_lock_users(selection: UserBulkSelection, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Lock every selected user that is not already locked."""
+    ids = await UserService.bulk_set_locked(db, selection, locked=True)
+    return UserBulkResult(affected=len(ids), ids=ids)
+
+@router.post("/users/bulk/unlock", response_model=UserBulkResult, name="bulk_unlock_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def bulk_unlock_users(selection: UserBulkSelection, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Unlock every selected locked user and reset their failed login attempts."""
+    ids = await UserService.bulk_set_locked(db, selection, locked=False)
+    return UserBulkResult(affected=len(ids), ids=ids)
+
+@router.post("/users/bulk/delete", response_model=UserBulkResult, name="bulk_delete_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def bulk_delete_users(selection: UserBulkSelection, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Delete every selected user."""
+    ids = await UserService.bulk_delete(db, selection)
+    return UserBulkResult(affected=len(ids), ids=ids)
+
+
 @router.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED, tags=["User Management Requires (Admin or Manager Roles)"], name="create_user")
 async def create_user(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
@@ -174,23 +257,34 @@ async def list_users(
     request: Request,
     skip: int = 0,
     limit: int = 10,
+    after: Optional[UUID] = None,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
+    """
+    List users in id order. Pass the last id of a page as `after`, or follow the `next` link, to
+    get the next page, which stays fast however deep you go; `after` takes precedence over `skip`,
+    which is kept for jumping to a page number.
+
+    Ids are time-ordered, so id order is creation order for users created since the switch to
+    UUIDv7. Users created before it have random ids and are interleaved in no particular order;
+    until then the listing had no ORDER BY at all.
+    """
     total_users = await UserService.count(db)
-    users = await UserService.list_users(db, skip, limit)
+    users = await UserService.list_users(db, skip, limit, after=after)
 
     user_responses = [
         UserResponse.model_validate(user) for user in users
     ]
     
-    pagination_links = generate_pagination_links(request, skip, limit, total_users)
+    next_after = users[-1].id if after is not None and len(users) == limit else None
+    pagination_links = generate_pagination_links(request, skip, limit, total_users, after=after, next_after=next_after)
     
     # Construct the final response with pagination details
     return UserListResponse(
         items=user_responses,
         total=total_users,
-        page=skip // limit + 1,
+        page=skip // limit + 1 if after is None else None,
         size=len(user_responses),
         links=pagination_links  # Ensure you have appropriate logic to create these links
     )
@@ -210,38 +304,40 @@ async def register(user_data: UserCreate, session: AsyncSession = Depends(get_db
 @router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"], description="Use the same email and password you registered with. Email goes into `username` field."
 )
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    user, is_locked = await UserService.authenticate(session, form_data.username, form_data.password)
+    if is_locked:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
-
-    user = await UserService.login_user(session, form_data.username, form_data.password)
     if user:
-        access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-
-        access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
-            expires_delta=access_token_expires
-        )
-
-        return {"access_token": access_token, "token_type": "bearer"}
+        return TokenService.issue_token_pair(user.email, str(user.role.name))
     raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
 @router.post("/login/", include_in_schema=False, response_model=TokenResponse, tags=["Login and Registration"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
+    user, is_locked = await UserService.authenticate(session, form_data.username, form_data.password)
+    if is_locked:
         raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
-
-    user = await UserService.login_user(session, form_data.username, form_data.password)
     if user:
-        access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+        return TokenService.issue_token_pair(user.email, str(user.role.name))
+    raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
-        access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
-            expires_delta=access_token_expires
-        )
+@router.post("/token/refresh", response_model=TokenResponse, tags=["Login and Registration"])
+async def refresh_token(token_request: RefreshTokenRequest, session: AsyncSession = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access and refresh token pair.
 
-        return {"access_token": access_token, "token_type": "bearer"}
-    raise HTTPException(status_code=401, detail="Incorrect email or password.")
+    Each refresh token can be used once. Reusing one revokes every token issued from the same login.
+    """
+    tokens = await TokenService.rotate_refresh_token(session, token_request.refresh_token)
+    if tokens:
+        return tokens
+    raise HTTPException(status_code=401, detail="Invalid or expired refresh token.")
 
+@router.get("/.well-known/jwks.json", name="jwks", tags=["Login and Registration"])
+async def jwks():
+    """
+    Public signing keys in JWKS format, so other services can verify access tokens locally.
+    """
+    return get_jwks()
 
 @router.get("/verify-email/{user_id}/{token}", status_code=status.HTTP_200_OK, name="verify_email", tags=["Login and Registration"])
 async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
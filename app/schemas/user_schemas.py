@@ -1,13 +1,13 @@
 from builtins import ValueError, any, bool, str
 from pydantic import BaseModel, EmailStr, Field, HttpUrl, ValidationError, validator, root_validator
-from typing import Optional, List
-from datetime import datetime
+from typing import Dict, Optional, List
+from datetime import date, datetime
 from enum import Enum
 import uuid
 import re
 
-import pytest
-
+from app.schemas.link_schema import Link
+from app.schemas.pagination_schema import PaginationLink
 from app.utils.nickname_gen import generate_nickname
 
 class UserRole(str, Enum):
@@ -48,6 +48,10 @@ def validate_password_complexity(password: str):
         )
     return password
 
+def normalize_email(email: str) -> str:
+    """Emails are stored and looked up in this form, so matching is case-insensitive on a plain index."""
+    return email.strip().lower()
+
 def validate_email(email: str) -> str:
     pattern = (
         r"^(?!.*\.\.)"                      # no double dots
@@ -59,7 +63,7 @@ def validate_email(email: str) -> str:
     
     if not re.match(pattern, email):
         raise ValueError("Invalid email format.")
-    return email.lower().strip()  
+    return normalize_email(email)
 
 class UserCreate(UserBase):
     email: EmailStr = Field(..., example="john.doe@example.com")
@@ -77,6 +81,7 @@ class UserUpdate(UserBase):
     linkedin_profile_url: Optional[str] =Field(None, example="https://linkedin.com/in/johndoe")
     github_profile_url: Optional[str] = Field(None, example="https://github.com/johndoe")
     _validate_urls = validator('profile_picture_url', 'linkedin_profile_url', 'github_profile_url', pre=True, allow_reuse=True)(validate_url)
+    _normalize_email = validator('email', allow_reuse=True)(lambda email: normalize_email(email) if email is not None else None)
 
 
     @root_validator(pre=True)
@@ -111,6 +116,64 @@ class UserListResponse(BaseModel):
         "github_profile_url": "https://github.com/johndoe"
     }])
     total: int = Field(..., example=100)
-    page: int = Field(..., example=1)
+    page: Optional[int] = Field(None, example=1, description="Page number for skip/limit listings; null when paging with after.")
     size: int = Field(..., example=10)
+    links: List[PaginationLink] = Field(default_factory=list)
+
+
+class UserBatchGetRequest(BaseModel):
+    ids: List[uuid.UUID] = Field(..., min_length=1, example=[uuid.uuid4(), uuid.uuid4()])
+
+class UserBatchGetItem(BaseModel):
+    id: uuid.UUID = Field(..., example=uuid.uuid4())
+    found: bool = Field(..., example=True)
+    user: Optional[UserResponse] = None
+    links: List[Link] = []
+
+class UserBatchGetResponse(BaseModel):
+    items: List[UserBatchGetItem] = Field(..., description="One entry per requested id, in request order.")
+
+class UserBulkFilter(BaseModel):
+    role: Optional[UserRole] = Field(None, example="AUTHENTICATED")
+    is_locked: Optional[bool] = Field(None, example=False)
+    email_verified: Optional[bool] = Field(None, example=False)
+    created_before: Optional[datetime] = Field(None, example="2025-01-01T00:00:00Z")
+    created_after: Optional[datetime] = Field(None, example="2024-01-01T00:00:00Z")
+    last_login_before: Optional[datetime] = Field(None, example="2025-01-01T00:00:00Z")
+
+    @root_validator(pre=True)
+    def at_least_one_criterion(cls, values):
+        # An empty filter would match every user
+        if not any(v is not None for v in values.values()):
+            raise ValueError("A filter needs at least one criterion")
+        return values
+
+class UserBulkSelection(BaseModel):
+    ids: Optional[List[uuid.UUID]] = Field(None, min_length=1, example=[uuid.uuid4()])
+    filter: Optional[UserBulkFilter] = None
+
+    @root_validator(pre=True)
+    def ids_or_filter(cls, values):
+        if (values.get("ids") is None) == (values.get("filter") is None):
+            raise ValueError("Provide either ids or filter")
+        return values
 
+class UserBulkRoleChange(UserBulkSelection):
+    role: UserRole = Field(..., example="MANAGER")
+
+class UserSignupDay(BaseModel):
+    day: date = Field(..., example="2025-04-01")
+    count: int = Field(..., example=12)
+
+class UserStatsResponse(BaseModel):
+    total: int = Field(..., example=1200)
+    by_role: Dict[str, int] = Field(..., example={"ANONYMOUS": 150, "AUTHENTICATED": 1000, "MANAGER": 40, "ADMIN": 10})
+    verified: int = Field(..., example=1050)
+    locked: int = Field(..., example=3, description="Users whose lockout had not expired at refreshed_at.")
+    professional: int = Field(..., example=80)
+    signups_per_day: List[UserSignupDay] = Field(..., description="Signups for each UTC day of the requested window, oldest first.")
+    refreshed_at: Optional[datetime] = Field(None, description="When the counts were last recomputed.")
+
+class UserBulkResult(BaseModel):
+    affected: int = Field(..., example=2)
+    ids: List[uuid.UUID] = Field(..., description="Ids of the users that were changed or deleted.")
@@ -0,0 +1,107 @@
+"""
+Production launcher: gunicorn managing uvicorn workers.
+
+Usage:
+    python -m app.server
+
+Worker count, keep-alive, timeouts and recycling are read from the application settings
+(``WEB_CONCURRENCY``, ``SERVER_KEEPALIVE``, ...). Nothing from ``app.main`` is imported here so
+that the environment can be prepared before the application modules load.
+"""
+from builtins import dict, int, len, max, str
+import importlib.util
+import os
+import tempfile
+from typing import Any, Dict
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.util import import_app
+from uvicorn.workers import UvicornWorker
+
+from settings.config import settings
+
+
+def _module_available(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools when they are installed."""
+    CONFIG_KWARGS = {
+        "loop": "uvloop" if _module_available("uvloop") else "asyncio",
+        "http": "httptools" if _module_available("httptools") else "h11",
+        "lifespan": "on",
+    }
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, honouring container CPU affinity where the platform exposes it."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count(configured: int = 0) -> int:
+    """
+    One async worker per CPU. Each worker is a single event loop, and bcrypt checks block the
+    loop they run on, so more workers than cores only adds context switching.
+    """
+    return configured if configured > 0 else max(2, available_cpus())
+
+
+def post_fork(server, worker):
+    # With preload_app the parent may have created the engine; asyncpg connections are bound to
+    # an event loop, so each worker builds its own engine in the startup event instead.
+    from app.database import Database
+    Database.reset_after_fork()
+
+
+def child_exit(server, worker):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    return {
+        "bind": settings.server_bind,
+        "workers": worker_count(settings.web_concurrency),
+        "worker_class": "app.server.ProductionUvicornWorker",
+        "keepalive": settings.server_keepalive,
+        "timeout": settings.server_timeout,
+        "graceful_timeout": settings.server_graceful_timeout,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter,
+        "preload_app": settings.server_preload_app,
+        "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        "accesslog": "-",
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+    }
+
+
+class ProductionServer(BaseApplication):
+    def __init__(self, app_uri: str, options: Dict[str, Any]):
+        self.app_uri = app_uri
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return import_app(self.app_uri)
+
+
+def main():
+    # Metrics from every worker are aggregated through files in this directory (see app/utils/metrics.py).
+    # It must be set before prometheus_client is imported, which preload_app does in the parent.
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="prometheus-"))
+    ProductionServer("app.main:app", gunicorn_options()).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,63 @@
 # email_service.py
-from builtins import ValueError, dict, str
+from builtins import ValueError, dict, int, str
+import asyncio
+from typing import Iterable
 from settings.config import settings
 from app.utils.smtp_connection import SMTPClient
 from app.utils.template_manager import TemplateManager
 from app.models.user_model import User
 
 class EmailService:
+    subjects = {
+        'email_verification': "Verify Your Account",
+        'password_reset': "Password Reset Instructions",
+        'account_locked': "Account Locked Notification"
+    }
+
     def __init__(self, template_manager: TemplateManager):
         self.smtp_client = SMTPClient(
             server=settings.smtp_server,
             port=int(settings.smtp_port),
             username=settings.smtp_username,
-            password=settings.smtp_password
+            password=settings.smtp_password,
+            use_tls=settings.smtp_use_tls
         )
         self.template_manager = template_manager
 
     async def send_user_email(self, user_data: dict, email_type: str):
-        subject_map = {
-            'email_verification': "Verify Your Account",
-            'password_reset': "Password Reset Instructions",
-            'account_locked': "Account Locked Notification"
-        }
-
-        if email_type not in subject_map:
+        if email_type not in self.subjects:
             raise ValueError("Invalid email type")
 
         html_content = self.template_manager.render_template(email_type, **user_data)
-        self.smtp_client.send_email(subject_map[email_type], html_content, user_data['email'])
+        self.smtp_client.send_email(self.subjects[email_type], html_content, user_data['email'])
 
-    async def send_verification_email(self, user: User):
-        verification_url = f"{settings.server_base_url}verify-email/{user.id}/{user.verification_token}"
-        await self.send_user_email({
+    def _verification_email_data(self, user: User) -> dict:
+        return {
             "name": user.first_name,
-            "verification_url": verification_url,
+            "verification_url": f"{settings.server_base_url}verify-email/{user.id}/{user.verification_token}",
             "email": user.email
-        }, 'email_verification')
\ No newline at end of file
+        }
+
+    async def send_verification_email(self, user: User):
+        await self.send_user_email(self._verification_email_data(user), 'email_verification')
+
+    async def send_verification_emails(self, users: Iterable[User]) -> int:
+        """
+        Send verification emails to many users at once.
+
+        Messages are rendered from the compiled template and delivered over shared SMTP sessions
+        (``email_batch_size`` messages each), paced to ``email_rate_limit_per_second``. The blocking
+        SMTP work runs in a thread so the event loop keeps serving requests.
+
+        :return: The number of emails the SMTP server accepted.
+        """
+        messages = []
+        for user in users:
+            user_data = self._verification_email_data(user)
+            html_content = self.template_manager.render_template('email_verification', **user_data)
+            messages.append((self.subjects['email_verification'], html_content, user.email))
+        if not messages:
+            return 0
+        return await asyncio.to_thread(
+            self.smtp_client.send_batch, messages, settings.email_batch_size, settings.email_rate_limit_per_second
+        )
\ No newline at end of file
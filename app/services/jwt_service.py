@@ -1,9 +1,54 @@
 # app/services/jwt_service.py
-from builtins import dict, str
+from builtins import ValueError, dict, sorted, str
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
 import jwt
+from cryptography.hazmat.primitives import serialization
 from datetime import datetime, timedelta
 from settings.config import settings
 
+@lru_cache(maxsize=1)
+def get_signing_keys() -> Tuple[str, Any, Dict[str, Any]]:
+    """
+    Load the JWT keys once and cache the parsed key objects.
+
+    For HMAC algorithms the shared secret is used as-is. For RS256/ES256/EdDSA every ``<kid>.pem``
+    private key in ``settings.jwt_keys_dir`` is loaded; the one named by ``settings.jwt_key_id``
+    signs new tokens and all of them verify, so keys can be rotated without invalidating tokens.
+
+    Returns:
+        tuple: ``(active kid, signing key, {kid: verification key})``.
+    """
+    kid = settings.jwt_key_id
+    if settings.jwt_algorithm.startswith("HS"):
+        return kid, settings.jwt_secret_key, {kid: settings.jwt_secret_key}
+    private_keys = {
+        path.stem: serialization.load_pem_private_key(path.read_bytes(), password=None)
+        for path in sorted(Path(settings.jwt_keys_dir).glob("*.pem"))
+    }
+    if kid not in private_keys:
+        raise ValueError(f"Active JWT key '{kid}' not found in {settings.jwt_keys_dir}")
+    return kid, private_keys[kid], {key_id: key.public_key() for key_id, key in private_keys.items()}
+
+def get_jwks() -> Dict[str, List[dict]]:
+    """Public keys in JWKS format. Empty for HMAC algorithms, whose secret must never be published."""
+    if settings.jwt_algorithm.startswith("HS"):
+        return {"keys": []}
+    algorithm = jwt.get_algorithm_by_name(settings.jwt_algorithm)
+    _, _, verification_keys = get_signing_keys()
+    keys = []
+    for kid, public_key in verification_keys.items():
+        jwk = algorithm.to_jwk(public_key, as_dict=True)
+        jwk.update({"kid": kid, "alg": settings.jwt_algorithm, "use": "sig"})
+        keys.append(jwk)
+    return {"keys": keys}
+
+def _encode(payload: dict) -> str:
+    kid, signing_key, _ = get_signing_keys()
+    return jwt.encode(payload, signing_key, algorithm=settings.jwt_algorithm, headers={"kid": kid})
+
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     # Convert role to uppercase before encoding the JWT
@@ -11,12 +56,31 @@ def create_access_token(*, data: dict, expires_delta: timedelta = None):
         to_encode['role'] = to_encode['role'].upper()
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=settings.access_token_expire_minutes))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
-    return encoded_jwt
+    return _encode(to_encode)
+
+def create_refresh_token(*, data: dict, family_id: str = None, expires_delta: timedelta = None):
+    """
+    Create a long-lived refresh token carrying a unique ``jti`` and the ``fam`` (family) id
+    shared by every token rotated from the same login.
+    """
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=settings.refresh_token_expire_minutes))
+    to_encode.update({
+        "exp": expire,
+        "type": "refresh",
+        "jti": uuid.uuid4().hex,
+        "fam": family_id or uuid.uuid4().hex,
+    })
+    return _encode(to_encode)
 
 def decode_token(token: str):
     try:
-        decoded = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        active_kid, _, verification_keys = get_signing_keys()
+        # Tokens issued before kid headers were added belong to the active key.
+        key = verification_keys.get(jwt.get_unverified_header(token).get("kid", active_kid))
+        if key is None:
+            return None
+        decoded = jwt.decode(token, key, algorithms=[settings.jwt_algorithm])
         return decoded
     except jwt.PyJWTError:
         return None
@@ -0,0 +1,35 @@
+from builtins import int
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.token_service import TokenService
+from app.services.user_service import UserService
+from app.utils.scheduler import JobScheduler
+from settings.config import Settings
+
+class MaintenanceService:
+    """The periodic clean-up jobs, and the scheduler that runs them."""
+
+    @classmethod
+    async def purge_unverified_users(cls, session: AsyncSession, settings: Settings) -> int:
+        created_before = datetime.now(timezone.utc) - timedelta(days=settings.unverified_user_retention_days)
+        return await UserService.purge_unverified_users(
+            session, created_before, settings.maintenance_batch_size, settings.maintenance_batch_pause_seconds
+        )
+
+    @classmethod
+    async def refresh_user_stats(cls, session: AsyncSession) -> int:
+        await UserService.refresh_stats(session)
+        return 0  # Rebuilds the statistics views; no user rows change.
+
+    @classmethod
+    def build_scheduler(cls, engine, session_factory, settings: Settings) -> JobScheduler:
+        """Register the jobs enabled in ``settings``."""
+        scheduler = JobScheduler(engine, session_factory, settings.maintenance_tick_seconds)
+        if settings.unverified_user_retention_days:
+            scheduler.add_job(
+                "purge_unverified_users", settings.unverified_user_purge_interval_minutes * 60,
+                lambda session: cls.purge_unverified_users(session, settings),
+            )
+        scheduler.add_job("purge_expired_refresh_tokens", settings.refresh_token_purge_interval_minutes * 60, TokenService.purge_expired)
+        scheduler.add_job("refresh_user_stats", settings.user_stats_refresh_interval_minutes * 60, cls.refresh_user_stats)
+        return scheduler
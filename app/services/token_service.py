@@ -0,0 +1,86 @@
+from builtins import classmethod, str
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+import logging
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.refresh_token_model import ConsumedRefreshToken
+from app.models.user_model import User
+from app.services.jwt_service import create_access_token, create_refresh_token, decode_token
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+class TokenService:
+    @classmethod
+    def issue_token_pair(cls, email: str, role: str, family_id: Optional[str] = None) -> Dict[str, str]:
+        """Create an access token and a refresh token for the given subject."""
+        access_token = create_access_token(
+            data={"sub": email, "role": role},
+            expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+        )
+        refresh_token = create_refresh_token(data={"sub": email}, family_id=family_id)
+        return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+    @classmethod
+    async def rotate_refresh_token(cls, session: AsyncSession, refresh_token: str) -> Optional[Dict[str, str]]:
+        """
+        Exchange a refresh token for a new token pair in the same family.
+
+        Each refresh token can be exchanged once. Presenting a consumed token again is treated as
+        theft and revokes the whole family, so the legitimate holder has to log in again.
+        """
+        payload = decode_token(refresh_token)
+        if payload is None or payload.get("type") != "refresh":
+            return None
+        email, jti, family_id = payload.get("sub"), payload.get("jti"), payload.get("fam")
+        if not (email and jti and family_id):
+            return None
+
+        revoked = await session.execute(
+            select(ConsumedRefreshToken.jti)
+            .where(ConsumedRefreshToken.family_id == family_id, ConsumedRefreshToken.family_revoked.is_(True))
+            .limit(1)
+        )
+        if revoked.first():
+            return None
+
+        result = await session.execute(select(User.email, User.role, User.is_locked).where(User.email == email))
+        user = result.first()
+        if user is None or user.is_locked:
+            return None
+
+        session.add(ConsumedRefreshToken(
+            jti=jti,
+            family_id=family_id,
+            expires_at=datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
+        ))
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            logger.warning(f"Refresh token reuse detected, revoking token family {family_id}.")
+            await cls.revoke_family(session, family_id)
+            return None
+        return cls.issue_token_pair(user.email, user.role.name, family_id)
+
+    @classmethod
+    async def revoke_family(cls, session: AsyncSession, family_id: str) -> None:
+        # Keep the revocation until every token still outstanding in the family has expired.
+        outstanding_until = datetime.now(timezone.utc) + timedelta(minutes=settings.refresh_token_expire_minutes)
+        await session.execute(
+            update(ConsumedRefreshToken)
+            .where(ConsumedRefreshToken.family_id == family_id)
+            .values(family_revoked=True, expires_at=outstanding_until)
+        )
+        await session.commit()
+
+    @classmethod
+    async def purge_expired(cls, session: AsyncSession) -> int:
+        """Delete consumed tokens that have expired, keeping the revocation store small."""
+        result = await session.execute(
+            delete(ConsumedRefreshToken).where(ConsumedRefreshToken.expires_at < datetime.now(timezone.utc))
+        )
+        await session.commit()
+        return result.rowcount
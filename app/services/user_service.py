@@ -1,23 +1,27 @@
-from builtins import Exception, bool, classmethod, int, str
-from datetime import datetime, timezone
+from builtins import Exception, bool, classmethod, dict, float, int, len, list, max, min, range, str, sum
+import asyncio
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
 import secrets
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from pydantic import ValidationError
-from sqlalchemy import func, null, update, select
+from sqlalchemy import DateTime, Row, and_, any_, bindparam, case, delete, func, literal, null, or_, text, true, update, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dependencies import get_email_service, get_settings
-from app.models.user_model import User
-from app.schemas.user_schemas import UserCreate, UserUpdate
+from sqlalchemy.orm import joinedload, selectinload
+from app.models.user_model import LOCKED_INDEFINITELY, User, utcnow
+from app.models.user_profile_model import PROFILE_FIELDS, UserProfile
+from app.models.user_stats_model import MATERIALIZED_VIEWS, live_user_signups_daily_query, live_user_stats_query, user_signups_daily, user_stats
+from app.schemas.user_schemas import UserBulkFilter, UserBulkSelection, UserCreate, UserUpdate, normalize_email
 from app.utils.nickname_gen import generate_nickname
-from app.utils.security import generate_verification_token, hash_password, verify_password
+from app.utils.security import generate_verification_token, hash_password, hash_verification_token, verify_dummy_password, verify_password
 from uuid import UUID
 from app.services.email_service import EmailService
+from settings.config import settings
 from app.models.user_model import UserRole
 import logging
 
-settings = get_settings()
 logger = logging.getLogger(__name__)
 
 class UserService:
@@ -33,14 +37,38 @@ class UserService:
             return None
 
     @classmethod
-    async def _fetch_user(cls, session: AsyncSession, **filters) -> Optional[User]:
+    async def _fetch_user(cls, session: AsyncSession, with_profile: bool = False, **filters) -> Optional[User]:
+        """Fetch one user; the profile is joined in only when ``with_profile`` is set."""
         query = select(User).filter_by(**filters)
+        if with_profile:
+            query = query.options(joinedload(User.profile))
         result = await cls._execute_query(session, query)
         return result.scalars().first() if result else None
 
     @classmethod
-    async def get_by_id(cls, session: AsyncSession, user_id: UUID) -> Optional[User]:
-        return await cls._fetch_user(session, id=user_id)
+    async def get_by_id(cls, session: AsyncSession, user_id: UUID, with_profile: bool = False) -> Optional[User]:
+        return await cls._fetch_user(session, with_profile=with_profile, id=user_id)
+
+    @classmethod
+    async def get_by_ids(cls, session: AsyncSession, user_ids: List[UUID]) -> Dict[UUID, User]:
+        """
+        Fetch many users in one query, keyed by id. Missing ids are simply absent from the result.
+
+        On PostgreSQL the ids are bound as a single array (``id = ANY($1)``), so the statement text, and
+        with it asyncpg's prepared statement, is the same whatever the number of ids.
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        if not unique_ids:
+            return {}
+        result = await session.execute(select(User).where(cls._id_in(session, unique_ids)).options(selectinload(User.profile)))
+        return {user.id: user for user in result.scalars()}
+
+    @classmethod
+    def _id_in(cls, session: AsyncSession, user_ids: List[UUID]):
+        """``id = ANY(:ids)`` on PostgreSQL, a plain IN elsewhere."""
+        if session.get_bind().dialect.name == "postgresql":
+            return User.id == any_(bindparam("user_ids", user_ids, type_=ARRAY(PG_UUID(as_uuid=True))))
+        return User.id.in_(user_ids)
 
     @classmethod
     async def get_by_nickname(cls, session: AsyncSession, nickname: str) -> Optional[User]:
@@ -48,7 +76,7 @@ class UserService:
 
     @classmethod
     async def get_by_email(cls, session: AsyncSession, email: str) -> Optional[User]:
-        return await cls._fetch_user(session, email=email)
+        return await cls._fetch_user(session, email=normalize_email(email))
 
     @classmethod
     async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService) -> Optional[User]:
@@ -60,7 +88,7 @@ class UserService:
                 return None
             validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
             new_user = User(**validated_data)
-            new_user.verification_token = generate_verification_token()
+            cls._issue_verification_token(new_user)
             new_nickname = generate_nickname()
             while await cls.get_by_nickname(session, new_nickname):
                 new_nickname = generate_nickname()
@@ -75,26 +103,69 @@ class UserService:
             return None
 
     @classmethod
-    async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str]) -> Optional[User]:
+    def _issue_verification_token(cls, user: User) -> str:
+        """Give the user a new verification token; only its hash and expiry are persisted."""
+        token = generate_verification_token()
+        user.verification_token = token
+        user.verification_token_hash = hash_verification_token(token)
+        if settings.verification_token_expire_hours:
+            user.verification_token_expires_at = datetime.now(timezone.utc) + timedelta(hours=settings.verification_token_expire_hours)
+        return token
+
+    @classmethod
+    async def update(cls, session: AsyncSession, user_id: UUID, update_data: Dict[str, str], expected_updated_at: Optional[datetime] = None) -> Optional[User]:
+        """
+        Update a user. When ``expected_updated_at`` is given the update only applies if the row has not
+        changed since then, and a 412 is raised otherwise.
+
+        Account fields are written to ``users`` and profile fields to ``user_profiles``, in one
+        transaction. ``users.updated_at`` moves on every update, so the ETag covers the profile too.
+        """
         try:
             # validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
             validated_data = UserUpdate(**update_data).dict(exclude_unset=True)
 
             if 'password' in validated_data:
                 validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
-            query = update(User).where(User.id == user_id).values(**validated_data).execution_options(synchronize_session="fetch")
-            await cls._execute_query(session, query)
-            updated_user = await cls.get_by_id(session, user_id)
-            if updated_user:
-                session.refresh(updated_user)  # Explicitly refresh the updated user object
-                logger.info(f"User {user_id} updated successfully.")
-                return updated_user
-            else:
-                logger.error(f"User {user_id} not found after update attempt.")
-            return None
+            profile_data = {field: validated_data.pop(field) for field in PROFILE_FIELDS if field in validated_data}
+            query = (
+                update(User).where(User.id == user_id)
+                .values(updated_at=utcnow(), **validated_data)
+                .execution_options(synchronize_session=False)
+            )
+            if expected_updated_at is not None:
+                query = query.where(User.updated_at == expected_updated_at)
+            try:
+                result = await session.execute(query)
+                if result.rowcount == 0:
+                    await session.rollback()
+                    if expected_updated_at is not None:
+                        raise HTTPException(status_code=412, detail="User was modified by another request")
+                    logger.error(f"User {user_id} not found after update attempt.")
+                    return None
+                if profile_data:
+                    result = await session.execute(
+                        update(UserProfile).where(UserProfile.user_id == user_id).values(**profile_data)
+                        .execution_options(synchronize_session=False)
+                    )
+                    if result.rowcount == 0:
+                        session.add(UserProfile(user_id=user_id, **profile_data))
+                await session.commit()
+            except SQLAlchemyError as e:
+                logger.error(f"Database error: {e}")
+                await session.rollback()
+                return None
+            # populate_existing replaces any stale copy of the user already in the session.
+            result = await session.execute(
+                select(User).where(User.id == user_id).options(joinedload(User.profile)).execution_options(populate_existing=True)
+            )
+            logger.info(f"User {user_id} updated successfully.")
+            return result.scalars().first()
         except ValidationError as e:
             logger.warning(f"Validation error during update: {e}")
             raise HTTPException(status_code=400, detail=e.errors()[0]['msg']) 
+        except HTTPException:
+            raise
         except Exception as e:  # Broad exception handling for debugging
             logger.error(f"Error during user update: {e}")
             return None
@@ -110,8 +181,13 @@ class UserService:
         return True
 
     @classmethod
-    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10) -> List[User]:
-        query = select(User).offset(skip).limit(limit)
+    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10, after: Optional[UUID] = None) -> List[User]:
+        """
+        List users in id order. With ``after``, return the page following that id (keyset pagination),
+        a primary key range scan at any depth. New ids are time-ordered, so pages follow creation order.
+        """
+        query = select(User).options(selectinload(User.profile)).order_by(User.id).limit(limit)
+        query = query.where(User.id > after) if after is not None else query.offset(skip)
         result = await cls._execute_query(session, query)
         return result.scalars().all() if result else []
 
@@ -121,31 +197,78 @@ class UserService:
     
 
     @classmethod
-    async def login_user(cls, session: AsyncSession, email: str, password: str) -> Optional[User]:
-        user = await cls.get_by_email(session, email)
-        if user:
-            if user.email_verified is False:
-                return None
-            if user.is_locked:
-                return None
-            if verify_password(password, user.hashed_password):
-                user.failed_login_attempts = 0
-                user.last_login_at = datetime.now(timezone.utc)
-                session.add(user)
-                await session.commit()
-                return user
-            else:
-                user.failed_login_attempts += 1
-                if user.failed_login_attempts >= settings.max_login_attempts:
-                    user.is_locked = True
-                session.add(user)
-                await session.commit()
-        return None
+    def _login_query(cls, email: str):
+        """Only the columns needed to authenticate, all of them included in ix_users_email."""
+        return select(
+            User.id, User.email, User.hashed_password, User.is_locked,
+            User.email_verified, User.failed_login_attempts, User.lockout_count, User.role
+        ).where(User.email == normalize_email(email))
+
+    @classmethod
+    async def _fetch_login_row(cls, session: AsyncSession, email: str) -> Optional[Row]:
+        """Fetch only the columns needed to authenticate, instead of the full user row."""
+        result = await session.execute(cls._login_query(email))
+        return result.first()
+
+    @classmethod
+    def lockout_expiry(cls, lockout_count: int) -> datetime:
+        """
+        When a lockout that follows ``lockout_count`` earlier consecutive lockouts ends. The lock
+        doubles with each repeated lockout, up to ``account_lock_max_minutes``.
+        """
+        if not settings.account_lock_minutes:
+            return LOCKED_INDEFINITELY
+        minutes = min(settings.account_lock_minutes * 2 ** min(lockout_count, 32), settings.account_lock_max_minutes)
+        return datetime.now(timezone.utc) + timedelta(minutes=minutes)
+
+    @classmethod
+    async def authenticate(cls, session: AsyncSession, email: str, password: str) -> Tuple[Optional[Row], bool]:
+        """
+        Authenticate a user with one SELECT and at most one UPDATE.
+
+        Reaching ``max_login_attempts`` failures locks the account until ``lockout_expiry``; the lock is
+        checked in the login SELECT and simply stops matching once it has passed.
+
+        :return: A ``(user, is_locked)`` tuple. ``user`` is the login row on success and None otherwise.
+        """
+        user = await cls._fetch_login_row(session, email)
+        if user is not None and user.is_locked:
+            return None, True
+        if user is None or user.email_verified is False:
+            # Keep rejection latency in line with a real password check.
+            verify_dummy_password(password)
+            return None, False
+        authenticated = verify_password(password, user.hashed_password)
+        if authenticated:
+            values = {"failed_login_attempts": 0, "lockout_count": 0, "last_login_at": datetime.now(timezone.utc)}
+        else:
+            failed_attempts = User.failed_login_attempts + 1
+            locks = failed_attempts >= settings.max_login_attempts
+            # Decided in SQL, so concurrent failures cannot skip past the threshold. The attempt
+            # count restarts with each lockout; the backoff comes from lockout_count.
+            values = {
+                "failed_login_attempts": case((locks, 0), else_=failed_attempts),
+                "locked_until": case((locks, literal(cls.lockout_expiry(user.lockout_count), DateTime(timezone=True))), else_=User.locked_until),
+                "lockout_count": case((locks, User.lockout_count + 1), else_=User.lockout_count),
+            }
+        try:
+            await session.execute(update(User).where(User.id == user.id).values(**values))
+            await session.commit()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error: {e}")
+            await session.rollback()
+            return None, False
+        return (user if authenticated else None), False
+
+    @classmethod
+    async def login_user(cls, session: AsyncSession, email: str, password: str) -> Optional[Row]:
+        user, _ = await cls.authenticate(session, email, password)
+        return user
 
     @classmethod
     async def is_account_locked(cls, session: AsyncSession, email: str) -> bool:
-        user = await cls.get_by_email(session, email)
-        return user.is_locked if user else False
+        result = await session.execute(select(User.is_locked).where(User.email == normalize_email(email)))
+        return bool(result.scalar())
 
 
     @classmethod
@@ -155,6 +278,7 @@ class UserService:
         if user:
             user.hashed_password = hashed_password
             user.failed_login_attempts = 0  # Resetting failed login attempts
+            user.lockout_count = 0
             user.is_locked = False  # Unlocking the user account, if locked
             session.add(user)
             await session.commit()
@@ -163,16 +287,31 @@ class UserService:
 
     @classmethod
     async def verify_email_with_token(cls, session: AsyncSession, user_id: UUID, token: str) -> bool:
-        user = await cls.get_by_id(session, user_id)
-        if user and user.verification_token == token:
-            user.email_verified = True
-            user.verification_token = None  # Clear the token once used
-            if user.role == UserRole.ANONYMOUS:
-                user.role = UserRole.AUTHENTICATED
-            session.add(user)
-            await session.commit()
-            return True
-        return False
+        """
+        Verify the email in a single UPDATE matched on id and token hash, so a wrong, used or expired
+        token costs one statement and never loads the row.
+        """
+        query = (
+            update(User)
+            .where(
+                User.id == user_id,
+                User.verification_token_hash == hash_verification_token(token),
+                or_(User.verification_token_expires_at.is_(None), User.verification_token_expires_at > datetime.now(timezone.utc)),
+            )
+            .values(
+                email_verified=True,
+                verification_token_hash=None,  # Clear the token once used
+                verification_token_expires_at=None,
+                role=case(
+                    (User.role == UserRole.ANONYMOUS, literal(UserRole.AUTHENTICATED, User.role.type)),
+                    else_=User.role,
+                ),
+            )
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await cls._execute_query(session, query)
+        return result is not None and result.first() is not None
 
     @classmethod
     async def count(cls, session: AsyncSession) -> int:
@@ -186,13 +325,155 @@ class UserService:
         result = await session.execute(query)
         count = result.scalar()
         return count
+
+    @classmethod
+    async def stats(cls, session: AsyncSession, days: int) -> Dict:
+        """
+        User counts for dashboards, with signups for each of the last ``days`` UTC days.
+
+        On PostgreSQL the counts come from the user_stats and user_signups_daily materialized views,
+        so they cost the same at any table size and are as of the last ``refresh_stats``.
+        """
+        since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        if session.get_bind().dialect.name == "postgresql":
+            groups = select(user_stats)
+            signups = select(user_signups_daily).where(user_signups_daily.c.day >= since)
+        else:
+            groups, signups = live_user_stats_query(), live_user_signups_daily_query(since)
+        rows = (await session.execute(groups)).all()
+        signups_by_day = {str(row.day): row.users for row in await session.execute(signups)}
+
+        by_role = {role.name: 0 for role in UserRole}
+        for row in rows:
+            by_role[row.role.name] += row.users
+        return {
+            "total": sum(row.users for row in rows),
+            "by_role": by_role,
+            "verified": sum(row.users for row in rows if row.email_verified),
+            "locked": sum(row.users for row in rows if row.is_locked),
+            "professional": sum(row.users for row in rows if row.is_professional),
+            "signups_per_day": [
+                {"day": day, "count": signups_by_day.get(str(day), 0)}
+                for day in (since + timedelta(days=offset) for offset in range(days))
+            ],
+            "refreshed_at": max((row.refreshed_at for row in rows), default=None),
+        }
+
+    @classmethod
+    async def refresh_stats(cls, session: AsyncSession):
+        """Recompute the statistics views read by ``stats``, without blocking readers while they rebuild."""
+        if session.get_bind().dialect.name != "postgresql":
+            return
+        for name in MATERIALIZED_VIEWS:
+            await session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+        await session.commit()
     
+    @classmethod
+    def _locked_condition(cls, locked: bool):
+        """
+        ``User.is_locked == locked`` written as a plain range on locked_until, which the partial index
+        ix_users_locked_until can serve (the hybrid's coalesce() cannot use an index).
+        """
+        now = datetime.now(timezone.utc)
+        return User.locked_until > now if locked else or_(User.locked_until.is_(None), User.locked_until <= now)
+
+    @classmethod
+    def _filter_condition(cls, user_filter: UserBulkFilter):
+        conditions = []
+        if user_filter.role is not None:
+            conditions.append(User.role == UserRole[user_filter.role.name])
+        if user_filter.is_locked is not None:
+            conditions.append(cls._locked_condition(user_filter.is_locked))
+        if user_filter.email_verified is not None:
+            conditions.append(User.email_verified if user_filter.email_verified else ~User.email_verified)
+        if user_filter.created_before is not None:
+            conditions.append(User.created_at < user_filter.created_before)
+        if user_filter.created_after is not None:
+            conditions.append(User.created_at > user_filter.created_after)
+        if user_filter.last_login_before is not None:
+            conditions.append(User.last_login_at < user_filter.last_login_before)
+        return and_(*conditions)
+
+    @classmethod
+    async def _bulk_apply(cls, session: AsyncSession, selection: UserBulkSelection, build_statement, pending, chunk_size: Optional[int] = None) -> List[UUID]:
+        """
+        Run a set-based UPDATE/DELETE over the selected users, one chunk per transaction.
+
+        ``build_statement(where)`` returns the statement for the rows matching ``where``; ``pending``
+        excludes rows already in the target state, so filter-based runs terminate and the returned ids
+        are only the users that actually changed. Committing per chunk keeps row locks short.
+        """
+        chunk_size = chunk_size or settings.bulk_chunk_size
+        affected: List[UUID] = []
+        if selection.ids is not None:
+            unique_ids = list(dict.fromkeys(selection.ids))
+            for start in range(0, len(unique_ids), chunk_size):
+                where = and_(cls._id_in(session, unique_ids[start:start + chunk_size]), pending)
+                result = await session.execute(build_statement(where).returning(User.id).execution_options(synchronize_session=False))
+                affected.extend(result.scalars().all())
+                await session.commit()
+        else:
+            affected = await cls.apply_in_chunks(session, and_(cls._filter_condition(selection.filter), pending), build_statement, chunk_size)
+        logger.info(f"Bulk operation affected {len(affected)} users.")
+        return affected
+
+    @classmethod
+    async def apply_in_chunks(cls, session: AsyncSession, matching, build_statement, chunk_size: int, pause_seconds: float = 0) -> List[UUID]:
+        """
+        Apply ``build_statement`` to the users matching ``matching``, ``chunk_size`` rows per transaction,
+        until no row matches. ``matching`` must stop matching a row once it has been changed.
+        ``pause_seconds`` between chunks lets background jobs leave room for request traffic.
+        """
+        affected: List[UUID] = []
+        while True:
+            chunk = select(User.id).where(matching).order_by(User.id).limit(chunk_size).scalar_subquery()
+            result = await session.execute(build_statement(User.id.in_(chunk)).returning(User.id).execution_options(synchronize_session=False))
+            ids = result.scalars().all()
+            await session.commit()
+            affected.extend(ids)
+            if len(ids) < chunk_size:
+                return affected
+            if pause_seconds:
+                await asyncio.sleep(pause_seconds)
+
+    @classmethod
+    def _unverified_condition(cls, created_before: datetime):
+        """Written to match the predicate of the partial index ix_users_unverified_created_at."""
+        return and_(~User.email_verified, User.created_at < created_before, User.role == UserRole.ANONYMOUS)
+
+    @classmethod
+    async def purge_unverified_users(cls, session: AsyncSession, created_before: datetime, chunk_size: int, pause_seconds: float = 0) -> int:
+        """Delete self-registered accounts that never verified their email and were created before ``created_before``."""
+        matching = cls._unverified_condition(created_before)
+        deleted = await cls.apply_in_chunks(session, matching, lambda where: delete(User).where(where), chunk_size, pause_seconds)
+        return len(deleted)
+
+    @classmethod
+    async def bulk_change_role(cls, session: AsyncSession, selection: UserBulkSelection, role: UserRole, chunk_size: Optional[int] = None) -> List[UUID]:
+        role = UserRole[role.name]
+        return await cls._bulk_apply(
+            session, selection, lambda where: update(User).where(where).values(role=role), User.role != role, chunk_size
+        )
+
+    @classmethod
+    async def bulk_set_locked(cls, session: AsyncSession, selection: UserBulkSelection, locked: bool, chunk_size: Optional[int] = None) -> List[UUID]:
+        """Lock users until an admin unlocks them, or unlock them, resetting their failed login attempts like unlock_user_account."""
+        values = {"locked_until": LOCKED_INDEFINITELY} if locked else {"locked_until": None, "failed_login_attempts": 0, "lockout_count": 0}
+        return await cls._bulk_apply(
+            session, selection, lambda where: update(User).where(where).values(**values), cls._locked_condition(not locked), chunk_size
+        )
+
+    @classmethod
+    async def bulk_delete(cls, session: AsyncSession, selection: UserBulkSelection, chunk_size: Optional[int] = None) -> List[UUID]:
+        return await cls._bulk_apply(session, selection, lambda where: delete(User).where(where), true(), chunk_size)
+
     @classmethod
     async def unlock_user_account(cls, session: AsyncSession, user_id: UUID) -> bool:
         user = await cls.get_by_id(session, user_id)
         if user and user.is_locked:
             user.is_locked = False
             user.failed_login_attempts = 0  # Optionally reset failed login attempts
+            user.lockout_count = 0
             session.add(user)
             await session.commit()
             return True
@@ -0,0 +1,53 @@
+from builtins import ValueError, int, str
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from uuid import UUID
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def user_etag(user_id: UUID, updated_at: datetime) -> str:
+    """
+    Strong ETag for a user resource, derived from its id and last modification time.
+
+    The value is opaque to clients but reversible here: ``update_user`` decodes ``If-Match`` with
+    ``parse_user_etag`` and checks it in the UPDATE's WHERE clause, without reading the user first.
+    """
+    if updated_at.tzinfo is None:
+        # SQLite returns naive timestamps even for timezone-aware columns; they are stored as UTC.
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    micros = (updated_at - _EPOCH) // timedelta(microseconds=1)
+    return f'"{user_id.hex}-{micros}"'
+
+def parse_user_etag(etag: str) -> Optional[Tuple[UUID, datetime]]:
+    """
+    Return the ``(user id, updated_at)`` encoded in an ETag, or None if it is not one of ours.
+
+    Weak ETags are rejected, since ``If-Match`` requires strong comparison.
+    """
+    value = etag.strip()
+    if not (value.startswith('"') and value.endswith('"')):
+        return None
+    try:
+        user_hex, micros = value.strip('"').split("-", 1)
+        return UUID(hex=user_hex), _EPOCH + timedelta(microseconds=int(micros))
+    except ValueError:
+        return None
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """
+    Check an ``If-None-Match`` / ``If-Match`` header against ``etag``.
+
+    ``If-None-Match`` uses weak comparison, so ETags weakened by a compressing proxy still match;
+    ``If-Match`` must pass ``weak=False``.
+    """
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
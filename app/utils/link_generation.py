@@ -1,9 +1,10 @@
 from builtins import dict, int, max, str
-from typing import List, Callable
+from typing import Callable, List, Optional
 from urllib.parse import urlencode
 from uuid import UUID
 
 from fastapi import Request
+from starlette.datastructures import URL
 from app.schemas.link_schema import Link
 from app.schemas.pagination_schema import PaginationLink
 
@@ -12,26 +13,68 @@ def create_link(rel: str, href: str, method: str = "GET", action: str = None) ->
     return Link(rel=rel, href=href, method=method, action=action)
 
 def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
-    # Ensure parameters are added in a specific order
-    query_string = f"skip={params['skip']}&limit={params['limit']}"
-    return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
+    # Ensure parameters are added in a specific order; a keyset link carries ``after`` instead of ``skip``
+    position = f"after={params['after']}" if params.get("after") is not None else f"skip={params['skip']}"
+    query_string = f"{position}&limit={params['limit']}"
+    separator = "&" if "?" in base_url else "?"
+    return PaginationLink(rel=rel, href=f"{base_url}{separator}{query_string}")
+
+USER_ACTIONS = [
+    ("self", "get_user", "GET", "view"),
+    ("update", "update_user", "PUT", "update"),
+    ("delete", "delete_user", "DELETE", "delete")
+]
+
+_USER_ID_PLACEHOLDER = "00000000-0000-0000-0000-000000000000"
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
     """
     Generate navigation links for user actions.
     """
-    actions = [
-        ("self", "get_user", "GET", "view"),
-        ("update", "update_user", "PUT", "update"),
-        ("delete", "delete_user", "DELETE", "delete")
-    ]
     return [
         create_link(rel, str(request.url_for(action, user_id=str(user_id))), method, action_desc)
-        for rel, action, method, action_desc in actions
+        for rel, action, method, action_desc in USER_ACTIONS
+    ]
+
+def user_links_builder(request: Request) -> Callable[[UUID], List[Link]]:
+    """
+    Resolve the user action routes once and return a function that builds links for any user id.
+
+    For responses with many users: each link is a string substitution into the resolved URL, and
+    since the URLs come from our own router, the Link models skip URL validation.
+    """
+    templates = [
+        (rel, str(request.url_for(action, user_id=_USER_ID_PLACEHOLDER)), method, action_desc)
+        for rel, action, method, action_desc in USER_ACTIONS
     ]
 
-def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
-    base_url = str(request.url)
+    def build(user_id: UUID) -> List[Link]:
+        user_id = str(user_id)
+        return [
+            Link.model_construct(rel=rel, href=href.replace(_USER_ID_PLACEHOLDER, user_id), action=action_desc)
+            for rel, href, method, action_desc in templates
+        ]
+    return build
+
+def generate_pagination_links(
+    request: Request, skip: int, limit: int, total_items: int,
+    after: Optional[UUID] = None, next_after: Optional[UUID] = None
+) -> List[PaginationLink]:
+    """
+    Pagination links for a listing. With ``after`` (keyset pagination) there is no page number to
+    count from, so only ``self``, ``first`` and, when ``next_after`` is given, ``next`` are returned.
+    """
+    # Other query parameters are kept; the pagination ones are replaced in each link.
+    base_url = str(URL(str(request.url)).remove_query_params(["skip", "limit", "after"]))
+    if after is not None:
+        links = [
+            create_pagination_link("self", base_url, {'after': after, 'limit': limit}),
+            create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}),
+        ]
+        if next_after is not None:
+            links.append(create_pagination_link("next", base_url, {'after': next_after, 'limit': limit}))
+        return links
+
     total_pages = (total_items + limit - 1) // limit
     links = [
         create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}),
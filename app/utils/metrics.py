@@ -0,0 +1,106 @@
+"""
+Prometheus metrics for the API.
+
+Set ``PROMETHEUS_MULTIPROC_DIR`` to a writable, empty directory before the workers start to aggregate
+metrics across gunicorn worker processes; without it each process only reports its own numbers.
+"""
+from builtins import str
+import os
+import time
+from typing import Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route name.", ["route", "method", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", multiprocess_mode="livesum"
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time by statement type.", ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "SQL statements that raised an error.")
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds", "Time spent hashing or verifying passwords.", ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0),
+)
+EMAIL_SEND_DURATION = Histogram(
+    "email_send_duration_seconds", "Time spent delivering an email over SMTP.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+JOB_RUN_DURATION = Histogram(
+    "maintenance_job_duration_seconds", "Time taken by one run of a scheduled maintenance job.", ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+JOB_ROWS_AFFECTED = Counter("maintenance_job_rows_total", "Rows changed or deleted by scheduled maintenance jobs.", ["job"])
+JOB_FAILURES = Counter("maintenance_job_failures_total", "Scheduled maintenance job runs that raised an error.", ["job"])
+SCHEDULER_LEADER = Gauge(
+    "maintenance_scheduler_leader", "1 in the process currently running the maintenance jobs.", multiprocess_mode="livesum"
+)
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the exposition payload and content type, aggregated across processes when configured."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+    DB_QUERY_DURATION.labels(operation=operation).observe(elapsed)
+
+def _handle_error(exception_context):
+    DB_QUERY_ERRORS.inc()
+    start_times = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if start_times:
+        start_times.pop()
+
+def instrument_engine(engine) -> None:
+    """Record statement counts and durations for an engine (sync or async)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency per route name and the number of in-flight requests."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # FastAPI stores the matched route in the scope; unmatched paths share one label to bound cardinality.
+            route_name = getattr(scope.get("route"), "name", None) or "unmatched"
+            REQUEST_LATENCY.labels(route=route_name, method=scope["method"], status=str(status_code)).observe(
+                time.perf_counter() - start
+            )
@@ -0,0 +1,149 @@
+"""
+Slow-query logging and per-request statement counting for SQLAlchemy engines.
+
+``instrument_queries`` hooks the engine's cursor events; ``QueryTrackingMiddleware`` counts the
+statements each request issues and warns when the same statement shape repeats, which usually
+means a query is being run in a loop (an N+1 pattern).
+"""
+from builtins import float, int, isinstance, len, str
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+_slow_query_thresholds: "WeakKeyDictionary" = WeakKeyDictionary()
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|\?|:\w+")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+
+class RequestQueryStats:
+    """Statements executed while serving a single request."""
+
+    def __init__(self, scope: Optional[Scope] = None, parent: Optional["RequestQueryStats"] = None):
+        self.scope = scope or {}
+        self.parent = parent
+        self.count = 0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str):
+        """Count a statement here and in every enclosing ``track_queries`` block."""
+        shape = statement_shape(statement)
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.shapes[shape] += 1
+            stats = stats.parent
+
+    @property
+    def route(self) -> str:
+        return getattr(self.scope.get("route"), "name", None) or self.scope.get("path", "-")
+
+    def repeated_shapes(self, threshold: int):
+        """Statement shapes executed more than ``threshold`` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so executions that differ only in bound values compare equal."""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return " ".join(shape.split())
+
+
+def _redact(parameters):
+    """Hide password hashes and truncate long values before parameters reach the log."""
+    def clean(value):
+        if isinstance(value, str):
+            if value.startswith("$2"):
+                return "<redacted>"
+            return value if len(value) <= 64 else value[:64] + "..."
+        return value
+    if isinstance(parameters, dict):
+        return {key: clean(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return type(parameters)(clean(value) for value in parameters)
+    return parameters
+
+
+@contextmanager
+def track_queries(scope: Optional[Scope] = None) -> Iterator[RequestQueryStats]:
+    """Collect statement counts for everything executed inside the block, including nested blocks."""
+    stats = RequestQueryStats(scope, parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["slow_query_start_time"].pop()) * 1000
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement)
+    # Engines derived with ``Engine.execution_options`` share the parent's listeners and threshold.
+    engine = getattr(conn.engine, "_proxied", conn.engine)
+    if elapsed_ms >= _slow_query_thresholds.get(engine, float("inf")):
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s | parameters=%r",
+            elapsed_ms, stats.route if stats else "-", " ".join(statement.split()), _redact(parameters)
+        )
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("slow_query_start_time"):
+        connection.info["slow_query_start_time"].pop()
+
+
+def instrument_queries(engine, slow_query_threshold_ms: int) -> None:
+    """Log statements slower than the threshold and feed per-request statement counts.
+
+    Calling it again for the same engine only updates the threshold.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    _slow_query_thresholds[sync_engine] = slow_query_threshold_ms
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class QueryTrackingMiddleware:
+    """Counts statements per request and warns about statement shapes repeated more than N times."""
+
+    def __init__(self, app: ASGIApp, threshold: Optional[int] = None):
+        self.app = app
+        self.threshold = settings.n_plus_one_threshold if threshold is None else threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(scope) as stats:
+            await self.app(scope, receive, send)
+
+        logger.debug("%s %s ran %d statements", scope["method"], stats.route, stats.count)
+        for shape, count in stats.repeated_shapes(self.threshold):
+            logger.warning("Possible N+1 in %s: statement ran %d times: %s", stats.route, count, shape)
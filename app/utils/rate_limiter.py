@@ -0,0 +1,197 @@
+from builtins import UnicodeDecodeError, ValueError, dict, float, int, isinstance, len, max, str
+import json
+import math
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.dependencies import get_settings
+
+
+class InMemoryRateLimitBackend:
+    """
+    Sliding-window log kept in process memory.
+
+    Every method runs to completion without awaiting, so on a single asyncio loop no lock is needed.
+    Each worker process keeps its own counters; use the Redis backend to share them across workers.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._hits: Dict[str, Deque[float]] = {}
+
+    async def hit(self, key: str, limit: int, window: int) -> float:
+        """Record a hit for ``key``. Returns 0 if allowed, otherwise the seconds until a slot frees up."""
+        now = time.monotonic()
+        hits = self._hits.get(key)
+        if hits is None:
+            if len(self._hits) >= self.max_keys:
+                self._prune(now, window)
+            hits = self._hits[key] = deque()
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        if len(hits) >= limit:
+            return max(hits[0] + window - now, 0.001)
+        hits.append(now)
+        return 0
+
+    def _prune(self, now: float, window: int):
+        """Drop keys whose newest hit has left the window."""
+        for key in [k for k, hits in self._hits.items() if not hits or hits[-1] <= now - window]:
+            del self._hits[key]
+
+    def reset(self):
+        self._hits.clear()
+
+
+class RedisRateLimitBackend:
+    """Sliding-window log stored in Redis sorted sets, shared by every worker that points at the same server."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        # Imported here so the in-memory backend works without the redis package installed.
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+
+    async def hit(self, key: str, limit: int, window: int) -> float:
+        now = time.time()
+        member = uuid.uuid4().hex
+        redis_key = self.prefix + key
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(redis_key, 0, now - window)
+            pipe.zadd(redis_key, {member: now})
+            pipe.zcard(redis_key)
+            pipe.zrange(redis_key, 0, 0, withscores=True)
+            pipe.expire(redis_key, window)
+            _, _, count, oldest, _ = await pipe.execute()
+        if count <= limit:
+            return 0
+        await self._redis.zrem(redis_key, member)
+        return max(oldest[0][1] + window - now, 0.001)
+
+
+def create_backend(backend: str, redis_url: Optional[str] = None):
+    if backend == "memory":
+        return InMemoryRateLimitBackend()
+    if backend == "redis":
+        return RedisRateLimitBackend(redis_url)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware that throttles login and registration per client IP and per account.
+
+    Requests over the limit are answered with 429 before routing, so they never reach the
+    database or bcrypt. Only the rate-limited paths have their body buffered.
+    """
+
+    def __init__(self, app: ASGIApp, backend=None):
+        self.app = app
+        self.backend = backend
+        self._rules: Optional[Dict[str, List[Tuple[str, int, int]]]] = None
+
+    def _load(self):
+        settings = get_settings()
+        self.enabled = settings.rate_limit_enabled
+        self.trust_proxy_headers = settings.rate_limit_trust_proxy_headers
+        if self.backend is None:
+            self.backend = create_backend(settings.rate_limit_backend, settings.rate_limit_redis_url)
+        window = settings.rate_limit_window_seconds
+        self._rules = {
+            "/login/": [
+                ("ip", settings.login_rate_limit_per_ip, window),
+                ("account", settings.login_rate_limit_per_account, window),
+            ],
+            "/register/": [
+                ("ip", settings.register_rate_limit_per_ip, window),
+                ("account", settings.register_rate_limit_per_account, window),
+            ],
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        if self._rules is None:
+            self._load()
+        rules = self._rules.get(scope["path"])
+        if not self.enabled or not rules:
+            await self.app(scope, receive, send)
+            return
+
+        body, more_body = await self._read_body(receive)
+        client_ip = self._client_ip(scope)
+        account = self._account(scope, body)
+        for kind, limit, window in rules:
+            identity = client_ip if kind == "ip" else account
+            if not identity:
+                continue
+            retry_after = await self.backend.hit(f"{scope['path']}:{kind}:{identity}", limit, window)
+            if retry_after:
+                response = JSONResponse(
+                    status_code=429,
+                    content={"detail": "Too many requests. Please try again later."},
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+                await response(scope, receive, send)
+                return
+
+        replayed = False
+
+        async def replay_receive() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": more_body}
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
+
+    @staticmethod
+    async def _read_body(receive: Receive, max_size: int = 64 * 1024) -> Tuple[bytes, bool]:
+        """Buffer the request body, up to ``max_size`` bytes, so it can be inspected and replayed."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            chunks.append(chunk)
+            size += len(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks), False
+            if size >= max_size:
+                return b"".join(chunks), True
+
+    def _client_ip(self, scope: Scope) -> Optional[str]:
+        if self.trust_proxy_headers:
+            for name, value in scope.get("headers", []):
+                if name == b"x-real-ip":
+                    return value.decode("latin-1").strip()
+        client = scope.get("client")
+        return client[0] if client else None
+
+    @staticmethod
+    def _account(scope: Scope, body: bytes) -> Optional[str]:
+        """Extract the login or registration email from a form or JSON body."""
+        content_type = ""
+        for name, value in scope.get("headers", []):
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+                break
+        try:
+            if content_type.startswith("application/x-www-form-urlencoded"):
+                account = parse_qs(body.decode("utf-8")).get("username", [None])[0]
+            elif content_type.startswith("application/json"):
+                payload = json.loads(body)
+                account = payload.get("email") if isinstance(payload, dict) else None
+            else:
+                return None
+        except (UnicodeDecodeError, ValueError):
+            return None
+        return account.strip().lower() if isinstance(account, str) and account.strip() else None
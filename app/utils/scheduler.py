@@ -0,0 +1,132 @@
+"""
+In-process scheduler for periodic maintenance jobs.
+
+Every worker runs a ``JobScheduler``, but only the one holding a Postgres session-level advisory
+lock runs jobs. The lock lives on a connection the leader keeps open, so if that worker dies its
+connection closes, the lock is released and another worker takes over on its next tick. Other
+databases have no advisory locks; there the scheduler assumes it is the only process.
+"""
+from builtins import Exception, float, int, str
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.utils.metrics import JOB_FAILURES, JOB_ROWS_AFFECTED, JOB_RUN_DURATION, SCHEDULER_LEADER
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock ("maint" in ASCII).
+MAINTENANCE_LOCK_KEY = 0x6D61696E74
+
+
+class ScheduledJob:
+    """A coroutine run every ``interval`` seconds with a fresh session; it returns the rows it affected."""
+
+    def __init__(self, name: str, interval: float, func: Callable[[AsyncSession], Awaitable[int]]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        # The first run waits a full interval, so a deploy does not start every job at once.
+        self.next_run = time.monotonic() + interval
+
+
+class JobScheduler:
+    def __init__(self, engine: AsyncEngine, session_factory, tick_seconds: float = 30, lock_key: int = MAINTENANCE_LOCK_KEY):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.tick_seconds = tick_seconds
+        self.lock_key = lock_key
+        self.jobs: List[ScheduledJob] = []
+        self._lock_conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add_job(self, name: str, interval: float, func: Callable[[AsyncSession], Awaitable[int]]):
+        self.jobs.append(ScheduledJob(name, interval, func))
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_conn is not None or self.engine.dialect.name != "postgresql"
+
+    def start(self):
+        if self._task is None and self.jobs:
+            self._task = asyncio.create_task(self._loop(), name="maintenance-scheduler")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release_leadership()
+
+    async def _loop(self):
+        while True:
+            try:
+                if await self._acquire_leadership():
+                    await self.run_due_jobs()
+            except Exception as e:
+                logger.error(f"Maintenance scheduler tick failed: {e}")
+                await self._release_leadership()
+            await asyncio.sleep(self.tick_seconds)
+
+    async def _acquire_leadership(self) -> bool:
+        """Take the advisory lock if no worker holds it, or check that this worker still does."""
+        if self.engine.dialect.name != "postgresql":
+            return True
+        if self._lock_conn is not None:
+            # Fails if the connection, and with it the lock, has been lost.
+            await self._lock_conn.execute(text("SELECT 1"))
+            return True
+        conn = await self.engine.connect()
+        # Autocommit, so the long-lived connection does not sit idle in a transaction.
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        acquired = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key})).scalar()
+        if not acquired:
+            await conn.close()
+            return False
+        logger.info("This worker is now running the maintenance jobs.")
+        self._lock_conn = conn
+        SCHEDULER_LEADER.set(1)
+        return True
+
+    async def _release_leadership(self):
+        conn, self._lock_conn = self._lock_conn, None
+        if conn is None:
+            return
+        SCHEDULER_LEADER.set(0)
+        try:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+            await conn.close()
+        except Exception:
+            # Never hand a connection that may still hold the lock back to the pool.
+            await conn.invalidate()
+
+    async def run_due_jobs(self):
+        for job in self.jobs:
+            if time.monotonic() >= job.next_run:
+                await self.run_job(job)
+
+    async def run_job(self, job: ScheduledJob) -> Optional[int]:
+        """Run one job now, recording its duration, rows affected and failures."""
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                affected = await job.func(session)
+        except Exception as e:
+            JOB_FAILURES.labels(job=job.name).inc()
+            logger.error(f"Maintenance job {job.name} failed: {e}")
+            affected = None
+        else:
+            JOB_ROWS_AFFECTED.labels(job=job.name).inc(affected)
+            if affected:
+                logger.info(f"Maintenance job {job.name} affected {affected} rows.")
+        finally:
+            JOB_RUN_DURATION.labels(job=job.name).observe(time.perf_counter() - started)
+            job.next_run = time.monotonic() + job.interval
+        return affected
@@ -1,8 +1,11 @@
 # app/security.py
 from builtins import Exception, ValueError, bool, int, str
+import hashlib
 import secrets
+from functools import lru_cache
 import bcrypt
 from logging import getLogger
+from app.utils.metrics import BCRYPT_DURATION
 
 # Set up logging
 logger = getLogger(__name__)
@@ -23,7 +26,8 @@ def hash_password(password: str, rounds: int = 12) -> str:
     """
     try:
         salt = bcrypt.gensalt(rounds=rounds)
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
+        with BCRYPT_DURATION.labels(operation="hash").time():
+            hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed_password.decode('utf-8')
     except Exception as e:
         logger.error("Failed to hash password: %s", e)
@@ -44,10 +48,31 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         ValueError: If the hashed password format is incorrect or the function fails to verify.
     """
     try:
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+        with BCRYPT_DURATION.labels(operation="verify").time():
+            return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
     except Exception as e:
         logger.error("Error verifying password: %s", e)
         raise ValueError("Authentication process encountered an unexpected error") from e
 
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    """Hash used to burn the same bcrypt time when there is no real hash to check."""
+    return hash_password(secrets.token_urlsafe(16))
+
+def verify_dummy_password(plain_password: str) -> bool:
+    """
+    Runs a bcrypt check against a throwaway hash so that rejecting an unknown account
+    costs the same as rejecting a wrong password. Always returns False.
+    """
+    verify_password(plain_password, _dummy_password_hash())
+    return False
+
 def generate_verification_token():
-    return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
\ No newline at end of file
+    return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
+
+def hash_verification_token(token: str) -> str:
+    """
+    Digest stored in place of a verification token. The tokens are random, so a fast hash is
+    enough: unlike a password there is nothing to brute-force from the digest.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
\ No newline at end of file
@@ -1,31 +1,81 @@
 # smtp_client.py
-from builtins import Exception, int, str
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from builtins import Exception, bool, float, int, len, max, range, str
+import time
+from typing import List, Tuple
 from settings.config import settings
+from app.utils.metrics import EMAIL_SEND_DURATION
 import logging
 
 class SMTPClient:
-    def __init__(self, server: str, port: int, username: str, password: str):
+    def __init__(self, server: str, port: int, username: str, password: str, use_tls: bool = True):
         self.server = server
         self.port = port
         self.username = username
         self.password = password
+        self.use_tls = use_tls
 
-    def send_email(self, subject: str, html_content: str, recipient: str):
-        try:
-            message = MIMEMultipart('alternative')
-            message['Subject'] = subject
-            message['From'] = self.username
-            message['To'] = recipient
-            message.attach(MIMEText(html_content, 'html'))
+    def _build_message(self, subject: str, html_content: str, recipient: str) -> str:
+        # Deferred: the smtplib/email stack is only needed once an email is actually sent
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        message = MIMEMultipart('alternative')
+        message['Subject'] = subject
+        message['From'] = self.username
+        message['To'] = recipient
+        message.attach(MIMEText(html_content, 'html'))
+        return message.as_string()
 
-            with smtplib.SMTP(self.server, self.port) as server:
-                server.starttls()  # Use TLS
+    def _connect(self):
+        """Open an SMTP session, upgraded to TLS and authenticated."""
+        import smtplib
+        server = smtplib.SMTP(self.server, self.port)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
                 server.login(self.username, self.password)
-                server.sendmail(self.username, recipient, message.as_string())
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def send_email(self, subject: str, html_content: str, recipient: str):
+        try:
+            message = self._build_message(subject, html_content, recipient)
+            with EMAIL_SEND_DURATION.time(), self._connect() as server:
+                server.sendmail(self.username, recipient, message)
             logging.info(f"Email sent to {recipient}")
         except Exception as e:
             logging.error(f"Failed to send email: {str(e)}")
             raise
+
+    def send_batch(self, messages: List[Tuple[str, str, str]], batch_size: int = 50, rate_limit_per_second: float = 0) -> int:
+        """
+        Send ``(subject, html_content, recipient)`` messages over as few SMTP sessions as possible.
+
+        Each session carries up to ``batch_size`` messages, since relays cap messages per connection,
+        and sending is paced to ``rate_limit_per_second`` when it is set. A recipient the server refuses
+        is logged and skipped; connection failures abort the batch.
+
+        :return: The number of messages accepted by the server.
+        """
+        import smtplib
+        interval = 1 / rate_limit_per_second if rate_limit_per_second else 0
+        next_send = time.monotonic()
+        sent = 0
+        for start in range(0, len(messages), max(batch_size, 1)):
+            with self._connect() as server:
+                for subject, html_content, recipient in messages[start:start + batch_size]:
+                    if interval:
+                        delay = next_send - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                        next_send = max(next_send, time.monotonic()) + interval
+                    try:
+                        with EMAIL_SEND_DURATION.time():
+                            server.sendmail(self.username, recipient, self._build_message(subject, html_content, recipient))
+                        sent += 1
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+                        logging.error(f"Failed to send email to {recipient}: {str(e)}")
+        logging.info(f"Sent {sent} of {len(messages)} emails in batch")
+        return sent
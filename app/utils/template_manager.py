@@ -1,17 +1,38 @@
-import markdown2
+from builtins import dict, enumerate, int, list, str, zip
+import html
+import re
 from pathlib import Path
+from string import Formatter
+from typing import Dict, List, Tuple
 
 class TemplateManager:
+    # Template files never change while the app runs, so their contents are shared by every instance.
+    _template_cache: Dict[str, str] = {}
+    # Rendered HTML per template, split around its placeholders; see _compile.
+    _compiled_cache: Dict[str, Tuple[List[str], List[str]]] = {}
+
     def __init__(self):
         # Dynamically determine the root path of the project
         self.root_dir = Path(__file__).resolve().parent.parent.parent  # Adjust this depending on the structure
         self.templates_dir = self.root_dir / 'email_templates'
 
     def _read_template(self, filename: str) -> str:
-        """Private method to read template content."""
+        """Private method to read template content, cached after the first read."""
         template_path = self.templates_dir / filename
+        cached = self._template_cache.get(str(template_path))
+        if cached is not None:
+            return cached
         with open(template_path, 'r', encoding='utf-8') as file:
-            return file.read()
+            content = file.read()
+        self._template_cache[str(template_path)] = content
+        return content
+
+    @classmethod
+    def warm_up(cls) -> None:
+        """Load every template into the cache ahead of the first email."""
+        manager = cls()
+        for template_path in manager.templates_dir.glob('*.md'):
+            manager._read_template(template_path.name)
 
     def _apply_email_styles(self, html: str) -> str:
         """Apply advanced CSS styles inline for email compatibility with excellent typography."""
@@ -32,15 +53,41 @@ class TemplateManager:
                 styled_html = styled_html.replace(f'<{tag}>', f'<{tag} style="{style}">')
         return styled_html
 
-    def render_template(self, template_name: str, **context) -> str:
-        """Render a markdown template with given context, applying advanced email styles."""
+    def _compile(self, template_name: str) -> Tuple[List[str], List[str]]:
+        """
+        Convert a template to styled HTML once, with markers in place of its placeholders.
+
+        Returns the HTML fragments between the markers and the field names that go between them,
+        so rendering is a join instead of a markdown conversion per email.
+        """
+        compiled = self._compiled_cache.get(template_name)
+        if compiled is not None:
+            return compiled
         header = self._read_template('header.md')
         footer = self._read_template('footer.md')
-
-        # Read main template and format it with provided context
         main_template = self._read_template(f'{template_name}.md')
-        main_content = main_template.format(**context)
+
+        fields = [field for _, field, _, _ in Formatter().parse(main_template) if field]
+        markers = {field: f"TEMPLATEFIELD{index}X" for index, field in enumerate(dict.fromkeys(fields))}
+        main_content = main_template.format(**markers)
 
         full_markdown = f"{header}\n{main_content}\n{footer}"
-        html_content = markdown2.markdown(full_markdown)
-        return self._apply_email_styles(html_content)
+        import markdown2  # Deferred: only needed once an email is actually rendered
+        styled = self._apply_email_styles(markdown2.markdown(full_markdown))
+
+        # re.split with a capturing group alternates literal HTML and captured marker indexes.
+        pieces = re.split(r"TEMPLATEFIELD(\d+)X", styled)
+        field_names = list(markers)
+        fragments = pieces[0::2]
+        names = [field_names[int(index)] for index in pieces[1::2]]
+        compiled = self._compiled_cache[template_name] = (fragments, names)
+        return compiled
+
+    def render_template(self, template_name: str, **context) -> str:
+        """Render a markdown template with given context, applying advanced email styles."""
+        fragments, names = self._compile(template_name)
+        parts = [fragments[0]]
+        for name, fragment in zip(names, fragments[1:]):
+            parts.append(html.escape(str(context[name])))
+            parts.append(fragment)
+        return "".join(parts)
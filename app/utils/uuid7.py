@@ -0,0 +1,35 @@
+"""
+Time-ordered UUIDs (version 7, RFC 9562).
+
+The first 48 bits are the Unix time in milliseconds, so ids generated later sort later and new
+rows are appended to the right edge of the primary key index instead of a random leaf. The 12
+bits after the version hold a counter seeded randomly each millisecond, which keeps ids from one
+process strictly increasing; the remaining 62 bits are random.
+"""
+from builtins import int
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+def uuid7() -> uuid.UUID:
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF  # Leave headroom before overflow
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted within this millisecond (or the clock went back): borrow the next one.
+                _last_ms += 1
+                _counter = 0
+        timestamp, counter = _last_ms, _counter
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    value = (timestamp & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
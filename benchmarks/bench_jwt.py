@@ -0,0 +1,62 @@
+"""
+Compare JWT signing and verification cost across algorithms.
+
+Each algorithm is timed with a key object parsed once (as ``jwt_service.get_signing_keys`` does),
+and RS256 is also timed re-parsing the PEM on every call to show what the key cache saves.
+
+Usage:
+    python -m benchmarks.bench_jwt [--iterations 2000]
+"""
+from builtins import dict, int, isinstance, len, max, min, print, round, str
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+PAYLOAD = {"sub": "john.doe@example.com", "role": "AUTHENTICATED"}
+
+def _private_keys():
+    return {
+        "HS256": "a_very_secret_key_that_is_long_enough",
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+
+def _public(key):
+    return key if isinstance(key, str) else key.public_key()
+
+def _ops_per_second(func, iterations: int) -> float:
+    seconds = min(timeit.repeat(func, number=iterations, repeat=3))
+    return round(iterations / seconds, 1)
+
+def run(iterations: int) -> dict:
+    payload = dict(PAYLOAD, exp=datetime.utcnow() + timedelta(minutes=15))
+    results = {}
+    for algorithm, private_key in _private_keys().items():
+        public_key = _public(private_key)
+        token = jwt.encode(payload, private_key, algorithm=algorithm, headers={"kid": "bench"})
+        results[algorithm] = {
+            "sign_ops_per_sec": _ops_per_second(
+                lambda: jwt.encode(payload, private_key, algorithm=algorithm, headers={"kid": "bench"}), iterations),
+            "verify_ops_per_sec": _ops_per_second(
+                lambda: jwt.decode(token, public_key, algorithms=[algorithm]), iterations),
+            "token_bytes": len(token),
+        }
+
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = rsa_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    results["RS256 (PEM parsed per call)"] = {
+        "sign_ops_per_sec": _ops_per_second(lambda: jwt.encode(payload, pem, algorithm="RS256"), max(iterations // 10, 1)),
+    }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
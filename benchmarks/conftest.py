@@ -0,0 +1,64 @@
+"""
+Baseline comparison for the microbenchmarks in this directory.
+
+Run with ``python -m pytest benchmarks``. Each benchmark's fastest round is compared against
+``baselines.json``, and a benchmark more than ``--regression-threshold`` slower than its
+baseline fails. The fastest round is used because machine noise only ever adds time to a
+round. ``--update-baselines`` records the current timings instead. Refresh the
+file on the machine that enforces it (usually CI) whenever a slowdown is intentional.
+"""
+from builtins import dict, float, round, sorted, str
+import json
+from pathlib import Path
+
+import pytest
+
+BASELINE_FILE = Path(__file__).with_name("baselines.json")
+
+def pytest_addoption(parser):
+    group = parser.getgroup("baselines")
+    group.addoption("--baseline-file", default=str(BASELINE_FILE), help="JSON file of baseline timings in seconds")
+    group.addoption("--update-baselines", action="store_true", help="Record the current timings as the new baselines")
+    group.addoption("--regression-threshold", type=float, default=0.5,
+                    help="Allowed slowdown over the baseline before failing (0.5 = 50%%)")
+
+@pytest.fixture(scope="session")
+def baselines(request):
+    path = Path(request.config.getoption("--baseline-file"))
+    recorded = json.loads(path.read_text()) if path.exists() else {}
+    updated = dict(recorded)
+    yield updated
+    if request.config.getoption("--update-baselines"):
+        path.write_text(json.dumps(dict(sorted(updated.items())), indent=2) + "\n")
+
+@pytest.fixture
+def bench(benchmark, baselines, request):
+    """
+    Run ``func`` under pytest-benchmark, then check its fastest round against the stored baseline.
+
+    ``rounds`` switches to a fixed number of rounds for functions too slow to calibrate, like bcrypt.
+    """
+    threshold = request.config.getoption("--regression-threshold")
+    update = request.config.getoption("--update-baselines")
+    name = request.node.name
+
+    def run(func, *args, rounds=None, **kwargs):
+        if rounds:
+            result = benchmark.pedantic(func, args=args, kwargs=kwargs, rounds=rounds, iterations=1)
+        else:
+            result = benchmark(func, *args, **kwargs)
+        if benchmark.stats is None:  # --benchmark-disable
+            return result
+        fastest = benchmark.stats.stats.min
+        if update:
+            baselines[name] = round(fastest, 9)
+        elif name in baselines:
+            limit = baselines[name] * (1 + threshold)
+            if fastest > limit:
+                pytest.fail(
+                    f"{name} regressed: fastest run {fastest * 1e6:.1f}us exceeds baseline "
+                    f"{baselines[name] * 1e6:.1f}us by more than {threshold:.0%}"
+                )
+        return result
+
+    return run
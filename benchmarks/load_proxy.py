@@ -0,0 +1,84 @@
+"""
+Compare authenticated GET throughput through the default and production nginx profiles.
+
+Start the stack with ``docker compose --profile production up --scale fastapi=2``, which
+serves the plain proxy on port 80 and the keepalive/microcache profile on port 8080.
+Each target is hit with the same number of concurrent clients for the same duration.
+The output is JSON with requests/sec, latency percentiles, and the share of responses
+served from the nginx cache.
+
+Usage:
+    python -m benchmarks.load_proxy --email admin@example.com --password 'Secret$123' \\
+        [--targets http://localhost http://localhost:8080] [--path /users/?limit=10] \\
+        [--concurrency 50] [--duration 15]
+"""
+from builtins import dict, float, int, len, min, print, range, round, sorted, str
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+import httpx
+
+async def _login(base_url: str, email: str, password: str) -> str:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post("/login/", data={"username": email, "password": password})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+async def run_target(base_url: str, path: str, token: str, concurrency: int, duration: float) -> dict:
+    latencies: List[float] = []
+    statuses: dict = {}
+    cache_hits = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, headers={
+        "Authorization": f"Bearer {token}", "Accept-Encoding": "gzip",
+    }) as client:
+        async def worker():
+            nonlocal cache_hits
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.headers.get("X-Cache-Status") == "HIT":
+                    cache_hits += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    total = len(latencies)
+    return {
+        "requests": total,
+        "requests_per_sec": round(total / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "cache_hit_ratio": round(cache_hits / total, 3) if total else 0.0,
+        "statuses": {str(code): count for code, count in statuses.items()},
+    }
+
+async def main(args) -> dict:
+    token = await _login(args.targets[0], args.email, args.password)
+    results = {}
+    for target in args.targets:
+        results[target] = await run_target(target, args.path, token, args.concurrency, args.duration)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", default=["http://localhost", "http://localhost:8080"])
+    parser.add_argument("--path", default="/users/?limit=10")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15.0)
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
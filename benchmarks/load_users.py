@@ -0,0 +1,230 @@
+"""
+Reproducible load scenarios for the user API, run in-process against SQLite or Postgres.
+
+Every scenario starts from a freshly created schema seeded with the same users. Requests go
+through the full ASGI app, middlewares included, with outbound email disabled. The output is
+JSON, one entry per scenario, with throughput, p50/p95/p99 latency and the number of SQL
+statements each request issued. It records the git commit, so saved runs can be compared.
+
+Scenarios:
+    register_burst  POST /register/ with new accounts
+    login_storm     POST /login/ for seeded accounts (bcrypt bound)
+    deep_listing    GET /users/ as an admin at offsets near the end of the table
+    mixed_crud      weighted mix of get, list, update, create and delete
+
+Usage:
+    python -m benchmarks.load_users [--database-url sqlite+aiosqlite:///./loadtest.db?timeout=30]
+        [--scenario all] [--requests 500] [--concurrency 20] [--seed-users 2000]
+        [--output results.json]
+"""
+from builtins import dict, enumerate, int, len, max, min, print, range, round, sorted, str, sum, zip
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from httpx import AsyncClient
+from sqlalchemy import insert
+
+from app.database import Base, Database
+from app.dependencies import get_email_service
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.models.user_profile_model import UserProfile
+from app.services.email_service import EmailService
+from app.services.jwt_service import create_access_token
+from app.utils.query_instrumentation import track_queries
+from app.utils.security import hash_password
+from app.utils.template_manager import TemplateManager
+
+PASSWORD = "LoadTest$1234"
+ADMIN_EMAIL = "load.admin@example.com"
+SCENARIOS = ["register_burst", "login_storm", "deep_listing", "mixed_crud"]
+
+class _NullSMTPClient:
+    def send_email(self, subject: str, html_content: str, recipient: str):
+        pass
+
+def _offline_email_service() -> EmailService:
+    """Render emails as usual but never open an SMTP connection."""
+    service = EmailService(template_manager=TemplateManager())
+    service.smtp_client = _NullSMTPClient()
+    return service
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+def summarize(samples: List[Tuple[str, int, float, int]], elapsed: float) -> dict:
+    """Aggregate ``(operation, status, seconds, statements)`` samples into the report format."""
+    latencies = [seconds for _, _, seconds, _ in samples]
+    statements = [count for _, _, _, count in samples]
+    statuses: Dict[str, int] = {}
+    for _, status, _, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, status, _, _ in samples if status >= 500),
+        "requests_per_sec": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "statements_per_request": round(sum(statements) / len(statements), 2) if statements else 0.0,
+        "max_statements": max(statements, default=0),
+        "statuses": statuses,
+    }
+
+class LoadRunner:
+    """Seeds the database and drives one scenario at a time through the ASGI app."""
+
+    def __init__(self, database_url: str, seed_users: int, concurrency: int, seed: int = 42):
+        self.database_url = database_url
+        self.seed_users = seed_users
+        self.concurrency = concurrency
+        self.seed = seed
+        self.user_ids: List[uuid.UUID] = []
+        self.emails: List[str] = []
+        self.admin_token = create_access_token(data={"sub": ADMIN_EMAIL, "role": UserRole.ADMIN.name})
+
+    async def reset(self):
+        """Recreate the schema and insert the seed users with a single precomputed password hash."""
+        Database.initialize(self.database_url, slow_query_threshold_ms=60_000)
+        engine = Database._engine
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+        hashed = hash_password(PASSWORD)
+        rng = random.Random(self.seed)
+        self.user_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(self.seed_users)]
+        self.emails = [f"load.user{i}@example.com" for i in range(self.seed_users)]
+        rows = [{
+            "id": uuid.uuid4(), "nickname": "load_admin", "email": ADMIN_EMAIL, "hashed_password": hashed,
+            "role": UserRole.ADMIN, "email_verified": True, "failed_login_attempts": 0,
+        }]
+        rows += [{
+            "id": user_id, "nickname": f"load_user{i}", "email": email, "hashed_password": hashed,
+            "role": UserRole.AUTHENTICATED, "email_verified": True, "failed_login_attempts": 0,
+        } for i, (user_id, email) in enumerate(zip(self.user_ids, self.emails))]
+        profiles = [
+            {"user_id": user_id, "first_name": "Load", "last_name": f"User{i}"} for i, user_id in enumerate(self.user_ids)
+        ]
+        async with Database.get_session_factory()() as session:
+            for start in range(0, len(rows), 1000):
+                await session.execute(insert(User), rows[start:start + 1000])
+            for start in range(0, len(profiles), 1000):
+                await session.execute(insert(UserProfile), profiles[start:start + 1000])
+            await session.commit()
+
+    async def _drive(self, client: AsyncClient, requests: int, make_request: Callable) -> dict:
+        samples: List[Tuple[str, int, float, int]] = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(index: int):
+            operation, method, url, kwargs = make_request(index)
+            async with semaphore:
+                with track_queries() as stats:
+                    started = time.perf_counter()
+                    response = await client.request(method, url, **kwargs)
+                    seconds = time.perf_counter() - started
+            samples.append((operation, response.status_code, seconds, stats.count))
+            return response
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+        report = summarize(samples, elapsed)
+        operations = sorted({operation for operation, _, _, _ in samples})
+        if len(operations) > 1:
+            report["by_operation"] = {
+                operation: summarize([s for s in samples if s[0] == operation], elapsed) for operation in operations
+            }
+        return report
+
+    async def run(self, scenario: str, requests: int) -> dict:
+        await self.reset()
+        rng = random.Random(self.seed)
+        auth = {"Authorization": f"Bearer {self.admin_token}"}
+        # The last tenth of the seeded users is only ever deleted, so no other request races a delete.
+        split = len(self.user_ids) - max(len(self.user_ids) // 10, 1)
+        active, deletable = self.user_ids[:split], self.user_ids[split:]
+
+        def register(i):
+            body = {"email": f"burst.user{i}@example.com", "password": PASSWORD}
+            return "register", "POST", "/register/", {"json": body}
+
+        def login(i):
+            form = {"username": self.emails[rng.randrange(len(self.emails))], "password": PASSWORD}
+            return "login", "POST", "/login/", {"data": form}
+
+        def deep_list(i):
+            skip = rng.randrange(int(len(self.user_ids) * 0.9), len(self.user_ids))
+            return "list", "GET", f"/users/?skip={skip}&limit=10", {"headers": auth}
+
+        def mixed(i):
+            roll = rng.random()
+            user_id = active[rng.randrange(len(active))]
+            if roll < 0.5:
+                return "get", "GET", f"/users/{user_id}", {"headers": auth}
+            if roll < 0.7:
+                return "list", "GET", f"/users/?skip={rng.randrange(len(active))}&limit=10", {"headers": auth}
+            if roll < 0.85:
+                return "update", "PUT", f"/users/{user_id}", {"headers": auth, "json": {"bio": f"bio {i}"}}
+            if roll < 0.95 or not deletable:
+                body = {"email": f"mixed.user{i}@example.com", "password": PASSWORD}
+                return "create", "POST", "/users/", {"headers": auth, "json": body}
+            return "delete", "DELETE", f"/users/{deletable.pop()}", {"headers": auth}
+
+        make_request = {"register_burst": register, "login_storm": login, "deep_listing": deep_list, "mixed_crud": mixed}[scenario]
+        app.dependency_overrides[get_email_service] = _offline_email_service
+        try:
+            async with AsyncClient(app=app, base_url="http://loadtest") as client:
+                return await self._drive(client, requests, make_request)
+        finally:
+            app.dependency_overrides.pop(get_email_service, None)
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def main(args) -> dict:
+    runner = LoadRunner(args.database_url, args.seed_users, args.concurrency, args.seed)
+    scenarios = SCENARIOS if args.scenario == "all" else [args.scenario]
+    results = {
+        "commit": _git_commit(),
+        "database": args.database_url.split(":", 1)[0],
+        "parameters": {"requests": args.requests, "concurrency": args.concurrency, "seed_users": args.seed_users, "seed": args.seed},
+        "scenarios": {},
+    }
+    try:
+        for scenario in scenarios:
+            results["scenarios"][scenario] = await runner.run(scenario, args.requests)
+    finally:
+        await Database.dispose()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("LOADTEST_DATABASE_URL", "sqlite+aiosqlite:///./loadtest.db?timeout=30"))
+    parser.add_argument("--scenario", choices=["all"] + SCENARIOS, default="all")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed-users", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(report + "\n")
+    print(report)
@@ -0,0 +1,44 @@
+"""Benchmarks for sending verification email through a local SMTP sink. See conftest.py for the baseline check."""
+from builtins import range
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from app.utils.smtp_connection import SMTPClient
+
+MESSAGES = 50
+
+class _SinkHandler:
+    async def handle_DATA(self, server, session, envelope):
+        return "250 OK"
+
+@pytest.fixture(scope="module")
+def smtp_client():
+    """A client pointed at a local SMTP server that accepts any login and discards every message."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    controller = Controller(
+        _SinkHandler(), hostname="127.0.0.1", port=port, auth_require_tls=False,
+        authenticator=lambda server, session, envelope, mechanism, auth_data: AuthResult(success=True),
+    )
+    controller.start()
+    try:
+        yield SMTPClient("127.0.0.1", port, "sender@example.com", "password", use_tls=False)
+    finally:
+        controller.stop()
+
+@pytest.fixture(scope="module")
+def messages():
+    return [("Verify Your Account", "<p>Hello</p>", f"user{i}@example.com") for i in range(MESSAGES)]
+
+def test_send_emails_one_session_each(bench, smtp_client, messages):
+    def send_each():
+        for message in messages:
+            smtp_client.send_email(*message)
+    bench(send_each, rounds=5)
+
+def test_send_emails_batched(bench, smtp_client, messages):
+    assert bench(smtp_client.send_batch, messages, batch_size=MESSAGES, rounds=5) == MESSAGES
@@ -0,0 +1,67 @@
+"""Microbenchmarks for helpers that run on every request. See conftest.py for the baseline check."""
+from builtins import len
+from uuid import uuid4
+
+import pytest
+from starlette.requests import Request
+
+from app.main import app
+from app.schemas.user_schemas import UserCreate, UserUpdate
+from app.services.jwt_service import create_access_token, decode_token
+from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.utils.nickname_gen import generate_nickname
+from app.utils.security import hash_password, verify_password
+from app.utils.template_manager import TemplateManager
+
+PASSWORD = "MySuperPassword$1234"
+
+@pytest.fixture(scope="module")
+def request_for_users():
+    """A real request bound to the app's router, so ``url_for`` does actual route lookups."""
+    return Request({
+        "type": "http", "app": app, "router": app.router, "method": "GET", "scheme": "http",
+        "server": ("testserver", 80), "root_path": "", "path": "/users/",
+        "query_string": b"skip=20&limit=10", "headers": [],
+    })
+
+@pytest.fixture(scope="module")
+def password_hash():
+    return hash_password(PASSWORD)
+
+@pytest.fixture(scope="module")
+def access_token():
+    return create_access_token(data={"sub": "john.doe@example.com", "role": "ADMIN"})
+
+def test_hash_password(bench):
+    bench(hash_password, PASSWORD, rounds=5)
+
+def test_verify_password(bench, password_hash):
+    assert bench(verify_password, PASSWORD, password_hash, rounds=5)
+
+def test_create_access_token(bench):
+    bench(create_access_token, data={"sub": "john.doe@example.com", "role": "ADMIN"})
+
+def test_decode_token(bench, access_token):
+    assert bench(decode_token, access_token)["sub"] == "john.doe@example.com"
+
+def test_render_verification_email(bench):
+    manager = TemplateManager()
+    context = {"name": "John", "verification_url": "http://testserver/verify-email/abc/def", "email": "john.doe@example.com"}
+    assert "John" in bench(manager.render_template, "email_verification", **context)
+
+def test_create_user_links(bench, request_for_users):
+    assert len(bench(create_user_links, uuid4(), request_for_users)) == 3
+
+def test_generate_pagination_links(bench, request_for_users):
+    bench(generate_pagination_links, request_for_users, 20, 10, 1000)
+
+def test_user_create_validation(bench):
+    data = {"email": "john.doe@example.com", "password": "Secure*1234", "nickname": "john_doe123",
+            "first_name": "John", "last_name": "Doe", "github_profile_url": "https://github.com/johndoe"}
+    bench(UserCreate, **data)
+
+def test_user_update_validation(bench):
+    bench(UserUpdate, first_name="John", bio="Experienced developer.", linkedin_profile_url="https://linkedin.com/in/johndoe")
+
+def test_generate_nickname(bench):
+    bench(generate_nickname)
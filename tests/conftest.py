@@ -10,12 +10,22 @@ Fixtures:
 - User fixtures (`user`, `locked_user`, `verified_user`, etc.): Set up various user states to test different behaviors under diverse conditions.
 - `token`: Generates an authentication token for testing secured endpoints.
 - `initialize_database`: Prepares the database at the session start.
-- `setup_database`: Sets up and tears down the database before and after each test.
+- `setup_database`: Builds the schema once per test session (per worker under pytest-xdist).
+- `db_session`: Runs each test inside a transaction that is rolled back afterwards, so commits made
+  by the code under test only release a SAVEPOINT and nothing leaks into the next test.
+
+Under pytest-xdist (`pytest -n N`) every worker gets its own database (`<name>_gw0`, ...), so parallel
+runs stay isolated. That only pays off with a spare core per worker: each worker imports the app and
+builds its own schema, and on a single core `-n 4` took about twice as long as a serial run.
+On SQLite the transaction hooks below make the same rollback isolation work.
 """
 
 # Standard library imports
+import asyncio
 from builtins import range
 from datetime import datetime, timedelta
+from functools import lru_cache
+import os
 from unittest.mock import patch
 from uuid import uuid4
 import uuid
@@ -24,8 +34,11 @@ import uuid
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from faker import Faker
 
 # Application-specific imports
@@ -40,11 +53,46 @@ from app.services.jwt_service import create_access_token
 
 fake = Faker()
 
+# The API tests register and log in far more often than the production limits allow;
+# the rate limiter itself is covered in tests/test_rate_limiter.py.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+def _worker_database_url(database_url: str) -> str:
+    """Point each pytest-xdist worker at its own database so parallel tests never share rows."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker:
+        return database_url
+    url = make_url(database_url)
+    return url.set(database=f"{url.database}_{worker}").render_as_string(hide_password=False)
+
+BASE_DATABASE_URL = get_settings().database_url
+# Set before anything reads the settings, so the app's own engine uses the worker database too.
+os.environ["DATABASE_URL"] = _worker_database_url(BASE_DATABASE_URL)
+
 settings = get_settings()
 TEST_DATABASE_URL = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
-engine = create_async_engine(TEST_DATABASE_URL, echo=settings.debug)
+# Each test runs on its own event loop, and asyncpg connections cannot move between loops,
+# so connections are not pooled across tests.
+engine = create_async_engine(TEST_DATABASE_URL, echo=settings.debug, poolclass=NullPool)
 AsyncTestingSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-AsyncSessionScoped = scoped_session(AsyncTestingSessionLocal)
+
+if engine.dialect.name == "sqlite":
+    # pysqlite manages transactions itself and never emits SAVEPOINT correctly, so the rolled-back
+    # test transaction below would leak rows. Take over BEGIN, as the SQLAlchemy docs recommend.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqlite_disable_implicit_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _sqlite_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+TEST_PASSWORD = "MySuperPassword$1234"
+
+@lru_cache
+def precomputed_password_hash() -> str:
+    """bcrypt is deliberately slow, so the fixtures share one hash of TEST_PASSWORD."""
+    return hash_password(TEST_PASSWORD)
 
 @pytest.fixture
 async def user_token(verified_user):
@@ -86,24 +134,48 @@ def initialize_database():
     except Exception as e:
         pytest.fail(f"Failed to initialize the database: {str(e)}")
 
-# this function setup and tears down (drops tales) for each test function, so you have a clean database for each test.
-@pytest.fixture(scope="function", autouse=True)
-async def setup_database():
+async def _create_worker_database():
+    """(Re)create this xdist worker's database, connecting through the base database."""
+    worker_database = make_url(TEST_DATABASE_URL).database
+    admin_engine = create_async_engine(
+        BASE_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"), isolation_level="AUTOCOMMIT", poolclass=NullPool
+    )
+    try:
+        async with admin_engine.connect() as conn:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{worker_database}" WITH (FORCE)'))
+            await conn.execute(text(f'CREATE DATABASE "{worker_database}"'))
+    finally:
+        await admin_engine.dispose()
+
+async def _build_schema():
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        await _create_worker_database()
     async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
-    yield
+
+async def _drop_schema():
     async with engine.begin() as conn:
-        # you can comment out this line during development if you are debugging a single test
-         await conn.run_sync(Base.metadata.drop_all)
-    await engine.dispose()
+        await conn.run_sync(Base.metadata.drop_all)
+
+# The schema is built once per session; isolation between tests comes from rolling back db_session.
+@pytest.fixture(scope="session", autouse=True)
+def setup_database():
+    asyncio.run(_build_schema())
+    yield
+    asyncio.run(_drop_schema())
 
 @pytest.fixture(scope="function")
 async def db_session(setup_database):
-    async with AsyncSessionScoped() as session:
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        # Commits inside the test only release a SAVEPOINT; the outer transaction is rolled back.
+        session = AsyncTestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
         try:
             yield session
         finally:
             await session.close()
+            await transaction.rollback()
 
 @pytest.fixture(scope="function")
 async def locked_user(db_session):
@@ -113,7 +185,7 @@ async def locked_user(db_session):
         "first_name": fake.first_name(),
         "last_name": fake.last_name(),
         "email": unique_email,
-        "hashed_password": hash_password("MySuperPassword$1234"),
+        "hashed_password": precomputed_password_hash(),
         "role": UserRole.AUTHENTICATED,
         "email_verified": False,
         "is_locked": True,
@@ -132,7 +204,7 @@ async def user(db_session):
         "first_name": fake.first_name(),
         "last_name": fake.last_name(),
         "email": fake.email(),
-        "hashed_password": hash_password("MySuperPassword$1234"),
+        "hashed_password": precomputed_password_hash(),
         "role": UserRole.AUTHENTICATED,
         "email_verified": False,
         "is_locked": False,
@@ -149,7 +221,7 @@ async def verified_user(db_session):
         "first_name": fake.first_name(),
         "last_name": fake.last_name(),
         "email": fake.email(),
-        "hashed_password": hash_password("MySuperPassword$1234"),
+        "hashed_password": precomputed_password_hash(),
         "role": UserRole.AUTHENTICATED,
         "email_verified": True,
         "is_locked": False,
@@ -166,7 +238,7 @@ async def unverified_user(db_session):
         "first_name": fake.first_name(),
         "last_name": fake.last_name(),
         "email": fake.email(),
-        "hashed_password": hash_password("MySuperPassword$1234"),
+        "hashed_password": precomputed_password_hash(),
         "role": UserRole.AUTHENTICATED,
         "email_verified": False,
         "is_locked": False,
@@ -1,16 +1,20 @@
 import asyncio
-from builtins import str
+from builtins import range, sorted, str
 from unittest.mock import patch
 import pytest
 from httpx import AsyncClient
 from app.main import app
 from app.models.user_model import User
+from app.utils.etag import user_etag
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
 from app.services.jwt_service import decode_token  # Import your FastAPI app
+from app.services.token_service import TokenService
 import pytest
 from app.services.jwt_service import decode_token
 from urllib.parse import urlencode
+from uuid import uuid4
+from settings.config import settings
 
 # Example of a test function using the async_client fixture
 @pytest.mark.asyncio
@@ -282,6 +286,35 @@ async def test_list_users_as_manager(async_client, manager_token):
     )
     assert response.status_code == 200
 
+@pytest.mark.asyncio
+async def test_list_users_keyset_pagination(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    first = await async_client.get("/users/?limit=20", headers=headers)
+    ids = [item["id"] for item in first.json()["items"]]
+    assert ids == sorted(ids)
+    response = await async_client.get(f"/users/?after={ids[9]}&limit=10", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == ids[10:20]
+    assert body["page"] is None
+    links = {link["rel"]: link["href"] for link in body["links"]}
+    assert links["self"].endswith(f"/users/?after={ids[9]}&limit=10")
+    assert links["next"].endswith(f"/users/?after={ids[19]}&limit=10")
+
+    # Following next continues where this page ended
+    response = await async_client.get(links["next"], headers=headers)
+    assert response.json()["items"][0]["id"] > ids[19]
+
+@pytest.mark.asyncio
+async def test_list_users_offset_links(async_client, admin_token, users_with_same_role_50_users):
+    response = await async_client.get("/users/?skip=10&limit=10", headers={"Authorization": f"Bearer {admin_token}"})
+    body = response.json()
+    assert body["page"] == 2
+    links = {link["rel"]: link["href"] for link in body["links"]}
+    assert links["self"].endswith("/users/?skip=10&limit=10")
+    assert links["next"].endswith("/users/?skip=20&limit=10")
+    assert links["prev"].endswith("/users/?skip=0&limit=10")
+
 @pytest.mark.asyncio
 async def test_list_users_unauthorized(async_client, user_token):
     response = await async_client.get(
@@ -289,3 +322,134 @@ async def test_list_users_unauthorized(async_client, user_token):
         headers={"Authorization": f"Bearer {user_token}"}
     )
     assert response.status_code == 403  # Forbidden, as expected for regular user
+
+@pytest.mark.asyncio
+async def test_refresh_token_flow(async_client, verified_user):
+    form_data = {
+        "username": verified_user.email,
+        "password": "MySuperPassword$1234"
+    }
+    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    assert response.status_code == 200
+    refresh_token = response.json()["refresh_token"]
+
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    assert response.json()["refresh_token"] != refresh_token
+
+    # The consumed token cannot be used a second time
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_refresh_token_rejected_as_access_token(async_client, admin_user):
+    tokens = TokenService.issue_token_pair(admin_user.email, "ADMIN")
+    response = await async_client.get("/users/", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_get_user_not_modified_with_matching_etag(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    etag = response.headers["ETag"]
+
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    response = await async_client.get(f"/users/{admin_user.id}", headers={**headers, "If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_update_user_if_match(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get(f"/users/{admin_user.id}", headers=headers)).headers["ETag"]
+
+    response = await async_client.put(f"/users/{admin_user.id}", json={"first_name": "First"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # The first update changed the user, so a second writer holding the old ETag is rejected
+    response = await async_client.put(f"/users/{admin_user.id}", json={"first_name": "Second"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412
+
+@pytest.mark.asyncio
+async def test_update_user_if_match_rejects_foreign_etags(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    etag = (await async_client.get(f"/users/{admin_user.id}", headers=headers)).headers["ETag"]
+    for if_match in ('"garbage"', "W/" + etag, user_etag(uuid4(), admin_user.updated_at)):
+        response = await async_client.put(f"/users/{admin_user.id}", json={"first_name": "First"}, headers={**headers, "If-Match": if_match})
+        assert response.status_code == 412
+
+@pytest.mark.asyncio
+async def test_list_users_gzip(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}", "Accept-Encoding": "gzip"}
+    response = await async_client.get("/users/?limit=50", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.json()["items"]) == 50
+
+@pytest.mark.asyncio
+async def test_batch_get_users_in_request_order(async_client, admin_token, users_with_same_role_50_users):
+    users = users_with_same_role_50_users
+    missing = str(uuid4())
+    ids = [str(users[3].id), missing, str(users[0].id), str(users[3].id)]
+    response = await async_client.post("/users/batch-get", json={"ids": ids}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["id"] for item in items] == ids
+    assert [item["found"] for item in items] == [True, False, True, True]
+    assert items[1]["user"] is None
+    assert items[0]["user"]["email"] == users[3].email
+    assert items[0]["links"][0]["href"].endswith(f"/users/{users[3].id}")
+
+@pytest.mark.asyncio
+async def test_batch_get_users_limits_ids(async_client, admin_token, monkeypatch):
+    monkeypatch.setattr(settings, "batch_get_max_ids", 2)
+    ids = [str(uuid4()) for _ in range(3)]
+    response = await async_client.post("/users/batch-get", json={"ids": ids}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_batch_get_users_access_denied(async_client, user_token):
+    response = await async_client.post("/users/batch-get", json={"ids": [str(uuid4())]}, headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_bulk_role_change_by_ids(async_client, admin_token, users_with_same_role_50_users):
+    ids = [str(user.id) for user in users_with_same_role_50_users[:5]]
+    response = await async_client.post("/users/bulk/role", json={"ids": ids, "role": "MANAGER"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.json()["affected"] == 5
+    assert sorted(response.json()["ids"]) == sorted(ids)
+
+@pytest.mark.asyncio
+async def test_bulk_lock_unlock_and_delete_by_filter(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.post("/users/bulk/lock", json={"filter": {"role": "AUTHENTICATED", "email_verified": False}}, headers=headers)
+    assert response.json()["affected"] == 50
+    response = await async_client.post("/users/bulk/unlock", json={"filter": {"is_locked": True}}, headers=headers)
+    assert response.json()["affected"] == 50
+    response = await async_client.post("/users/bulk/delete", json={"filter": {"email_verified": False}}, headers=headers)
+    assert response.json()["affected"] == 50
+
+@pytest.mark.asyncio
+async def test_bulk_mutations_require_admin(async_client, manager_token):
+    response = await async_client.post("/users/bulk/delete", json={"ids": [str(uuid4())]}, headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_bulk_mutation_rejects_empty_filter(async_client, admin_token):
+    response = await async_client.post("/users/bulk/delete", json={"filter": {}}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_user_stats(async_client, admin_user, admin_token, user_token):
+    response = await async_client.get("/users/stats?days=3", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 403
+    response = await async_client.get("/users/stats?days=3", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body["by_role"]) == {"ANONYMOUS", "AUTHENTICATED", "MANAGER", "ADMIN"}
+    assert len(body["signups_per_day"]) == 3
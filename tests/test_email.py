@@ -1,6 +1,14 @@
+from builtins import len, range, sorted
+import socket
+import time
+from types import SimpleNamespace
 from unittest.mock import MagicMock
+from uuid import uuid4
 import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
 from app.services.email_service import EmailService
+from app.utils.smtp_connection import SMTPClient
 from app.utils.template_manager import TemplateManager
 
 @pytest.mark.asyncio
@@ -22,3 +30,66 @@ async def test_send_markdown_email(email_service):
 
     # Assert the mocked email method was called once
     smtp_mock.send_email.assert_called_once()
+
+class _SinkHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+@pytest.fixture
+def smtp_sink():
+    """A local SMTP server that accepts any login and keeps every message in memory."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = _SinkHandler()
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=port, auth_require_tls=False,
+        authenticator=lambda server, session, envelope, mechanism, auth_data: AuthResult(success=True),
+    )
+    controller.start()
+    try:
+        yield SimpleNamespace(handler=handler, port=port)
+    finally:
+        controller.stop()
+
+def _sink_client(smtp_sink, monkeypatch):
+    client = SMTPClient("127.0.0.1", smtp_sink.port, "sender@example.com", "password", use_tls=False)
+    sessions = []
+    connect = client._connect
+    monkeypatch.setattr(client, "_connect", lambda: sessions.append(1) or connect())
+    return client, sessions
+
+def _users(count):
+    return [SimpleNamespace(id=uuid4(), verification_token="token", first_name=f"User{i}", email=f"user{i}@example.com")
+            for i in range(count)]
+
+def test_send_batch_reuses_sessions(smtp_sink, monkeypatch):
+    client, sessions = _sink_client(smtp_sink, monkeypatch)
+    messages = [("Subject", "<p>Hello</p>", f"user{i}@example.com") for i in range(7)]
+    assert client.send_batch(messages, batch_size=3) == 7
+    assert len(sessions) == 3
+    assert sorted(m.rcpt_tos[0] for m in smtp_sink.handler.messages) == sorted(m[2] for m in messages)
+
+def test_send_batch_respects_rate_limit(smtp_sink, monkeypatch):
+    client, _ = _sink_client(smtp_sink, monkeypatch)
+    messages = [("Subject", "<p>Hello</p>", f"user{i}@example.com") for i in range(5)]
+    started = time.perf_counter()
+    client.send_batch(messages, batch_size=50, rate_limit_per_second=50)
+    assert time.perf_counter() - started >= 4 / 50
+
+async def test_send_verification_emails_reuses_sessions(email_service, smtp_sink, monkeypatch):
+    client, sessions = _sink_client(smtp_sink, monkeypatch)
+    email_service.smtp_client = client
+    users = _users(200)
+
+    for user in users[:50]:
+        await email_service.send_verification_email(user)
+    assert await email_service.send_verification_emails(users) == 200
+
+    assert len(smtp_sink.handler.messages) == 250
+    assert len(sessions) == 50 + 4  # settings.email_batch_size defaults to 50
+    assert [m.rcpt_tos[0] for m in smtp_sink.handler.messages[50:]] == [user.email for user in users]
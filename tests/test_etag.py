@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.utils.etag import etag_matches, parse_user_etag, user_etag
+
+def test_user_etag_round_trip():
+    user_id = uuid4()
+    updated_at = datetime(2025, 4, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    etag = user_etag(user_id, updated_at)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert parse_user_etag(etag) == (user_id, updated_at)
+    assert parse_user_etag("W/" + etag) is None
+    assert parse_user_etag('"garbage"') is None
+
+def test_etag_matches():
+    etag = user_etag(uuid4(), datetime.now(timezone.utc))
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert etag_matches("W/" + etag, etag)
+    assert not etag_matches("W/" + etag, etag, weak=False)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
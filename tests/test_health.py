@@ -0,0 +1,25 @@
+import pytest
+from app.main import app, lifespan
+from app.utils.template_manager import TemplateManager
+
+@pytest.mark.asyncio
+async def test_healthz(async_client):
+    response = await async_client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+@pytest.mark.asyncio
+async def test_readyz_before_startup(async_client):
+    app.state.ready = False
+    response = await async_client.get("/readyz")
+    assert response.status_code == 503
+
+@pytest.mark.asyncio
+async def test_lifespan_warms_up_and_marks_ready(async_client):
+    TemplateManager._template_cache.clear()
+    async with lifespan(app):
+        assert app.state.ready is True
+        assert any(path.endswith("email_verification.md") for path in TemplateManager._template_cache)
+        response = await async_client.get("/readyz")
+        assert response.status_code == 200
+    assert app.state.ready is False
@@ -0,0 +1,59 @@
+from builtins import str
+from datetime import timedelta
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from app.services import jwt_service
+from app.services.jwt_service import create_access_token, decode_token, get_jwks, get_signing_keys
+
+def write_key(keys_dir, kid, private_key):
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    (keys_dir / f"{kid}.pem").write_bytes(pem)
+
+@pytest.fixture
+def asymmetric_settings(monkeypatch, tmp_path):
+    def configure(algorithm, kid):
+        monkeypatch.setattr(jwt_service.settings, "jwt_algorithm", algorithm)
+        monkeypatch.setattr(jwt_service.settings, "jwt_keys_dir", str(tmp_path))
+        monkeypatch.setattr(jwt_service.settings, "jwt_key_id", kid)
+        get_signing_keys.cache_clear()
+        return tmp_path
+    yield configure
+    get_signing_keys.cache_clear()
+
+def test_hs256_token_has_kid_header():
+    token = create_access_token(data={"sub": "user@example.com", "role": "admin"}, expires_delta=timedelta(minutes=5))
+    assert jwt_service.jwt.get_unverified_header(token)["kid"] == jwt_service.settings.jwt_key_id
+    assert decode_token(token)["role"] == "ADMIN"
+    assert get_jwks() == {"keys": []}
+
+@pytest.mark.parametrize("algorithm, private_key", [
+    ("RS256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+    ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+])
+def test_asymmetric_round_trip(asymmetric_settings, algorithm, private_key):
+    keys_dir = asymmetric_settings(algorithm, "key-1")
+    write_key(keys_dir, "key-1", private_key)
+    token = create_access_token(data={"sub": "user@example.com", "role": "ADMIN"})
+    assert decode_token(token)["sub"] == "user@example.com"
+    jwks = get_jwks()
+    assert [key["kid"] for key in jwks["keys"]] == ["key-1"]
+    assert "d" not in jwks["keys"][0], "JWKS must only contain public key material"
+
+def test_key_rotation_keeps_old_tokens_valid(asymmetric_settings):
+    keys_dir = asymmetric_settings("EdDSA", "old")
+    write_key(keys_dir, "old", ed25519.Ed25519PrivateKey.generate())
+    old_token = create_access_token(data={"sub": "user@example.com", "role": "ADMIN"})
+
+    write_key(keys_dir, "new", ed25519.Ed25519PrivateKey.generate())
+    asymmetric_settings("EdDSA", "new")
+    new_token = create_access_token(data={"sub": "user@example.com", "role": "ADMIN"})
+    assert jwt_service.jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert decode_token(old_token) is not None
+    assert decode_token(new_token) is not None
+
+    (keys_dir / "old.pem").unlink()
+    asymmetric_settings("EdDSA", "new")
+    assert decode_token(old_token) is None
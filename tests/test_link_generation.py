@@ -49,3 +49,26 @@ def test_generate_pagination_links(mock_request):
     assert len(links) >= 4
     expected_self_url = "http://testserver/users?limit=5&skip=10"
     assert normalize_url(str(links[0].href)) == normalize_url(expected_self_url), "Self link should match expected URL"
+
+def test_user_links_builder_matches_create_user_links():
+    from starlette.requests import Request as StarletteRequest
+    from app.main import app
+    from app.utils.link_generation import user_links_builder
+    request = StarletteRequest({
+        "type": "http", "app": app, "router": app.router, "method": "GET", "scheme": "http",
+        "server": ("testserver", 80), "root_path": "", "path": "/users/", "query_string": b"", "headers": [],
+    })
+    user_id = uuid4()
+    expected = create_user_links(user_id, request)
+    built = user_links_builder(request)(user_id)
+    assert [(link.rel, str(link.href), link.action) for link in built] == [(link.rel, str(link.href), link.action) for link in expected]
+
+def test_generate_keyset_pagination_links(mock_request):
+    after, next_after = uuid4(), uuid4()
+    mock_request.url = f"http://testserver/users?after={after}&limit=5"
+    links = {link.rel: str(link.href) for link in generate_pagination_links(mock_request, 0, 5, 50, after=after, next_after=next_after)}
+    assert links == {
+        "self": f"http://testserver/users?after={after}&limit=5",
+        "first": "http://testserver/users?skip=0&limit=5",
+        "next": f"http://testserver/users?after={next_after}&limit=5",
+    }
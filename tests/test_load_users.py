@@ -0,0 +1,25 @@
+from benchmarks.load_users import LoadRunner, summarize
+from app.database import Database
+
+def test_summarize_reports_percentiles_and_statements():
+    samples = [("get", 200, i / 1000, 2) for i in range(1, 101)] + [("get", 500, 0.5, 4)]
+    report = summarize(samples, elapsed=1.0)
+    assert report["requests"] == 101
+    assert report["errors"] == 1
+    assert report["p50_ms"] == 51.0
+    assert report["p99_ms"] == 100.0
+    assert report["max_statements"] == 4
+    assert report["statuses"] == {"200": 100, "500": 1}
+
+async def test_deep_listing_scenario_runs(tmp_path, monkeypatch):
+    # The harness recreates the schema, so give it its own SQLite database instead of the shared test one.
+    monkeypatch.setattr(Database, "_engine", None)
+    monkeypatch.setattr(Database, "_session_factory", None)
+    runner = LoadRunner(f"sqlite+aiosqlite:///{tmp_path}/load.db?timeout=30", seed_users=30, concurrency=4)
+    try:
+        report = await runner.run("deep_listing", requests=8)
+    finally:
+        await Database.dispose()
+    assert report["requests"] == 8
+    assert report["statuses"] == {"200": 8}
+    assert report["statements_per_request"] > 0
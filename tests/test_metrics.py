@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.utils.metrics import BCRYPT_DURATION, DB_QUERY_DURATION, instrument_engine
+from app.utils.security import hash_password
+from tests.conftest import TEST_DATABASE_URL
+
+def sample_count(histogram, **labels):
+    """Read the observation count of a labelled histogram."""
+    return next(
+        (sample.value for metric in histogram.collect() for sample in metric.samples
+         if sample.name.endswith("_count") and all(sample.labels.get(k) == v for k, v in labels.items())),
+        0
+    )
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_latency(async_client, admin_token):
+    await async_client.get("/users/", headers={"Authorization": f"Bearer {admin_token}"})
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="list_users",status="200"}' in response.text
+    assert "http_requests_in_flight" in response.text
+
+def test_bcrypt_duration_recorded():
+    before = sample_count(BCRYPT_DURATION, operation="hash")
+    hash_password("secure_password", rounds=4)
+    assert sample_count(BCRYPT_DURATION, operation="hash") == before + 1
+
+@pytest.mark.asyncio
+async def test_instrument_engine_records_queries():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    instrument_engine(engine)
+    instrument_engine(engine)  # Attaching twice must not double count
+    try:
+        before = sample_count(DB_QUERY_DURATION, operation="SELECT")
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        assert sample_count(DB_QUERY_DURATION, operation="SELECT") == before + 1
+    finally:
+        await engine.dispose()
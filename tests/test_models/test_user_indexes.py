@@ -0,0 +1,37 @@
+from builtins import str
+from datetime import datetime, timezone
+import uuid
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+from app.services.user_service import UserService
+
+async def explain(session: AsyncSession, query) -> str:
+    """
+    Plan ``query`` on PostgreSQL with sequential scans disabled, so the plan shows which index
+    the query can use even though the test table holds only a handful of rows.
+    """
+    if session.bind.dialect.name != "postgresql":
+        pytest.skip("EXPLAIN plans are checked on PostgreSQL only")
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    compiled = query.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True})
+    rows = await session.execute(text(f"EXPLAIN {compiled}"))
+    return "\n".join(row[0] for row in rows)
+
+async def test_login_query_is_index_only(db_session: AsyncSession, verified_user: User):
+    plan = await explain(db_session, UserService._login_query(verified_user.email))
+    assert "Index Only Scan using ix_users_email" in plan, plan
+
+async def test_locked_filter_uses_partial_index(db_session: AsyncSession, locked_user: User):
+    plan = await explain(db_session, select(User.id).where(UserService._locked_condition(True)))
+    assert "ix_users_locked_until" in plan, plan
+
+async def test_unverified_purge_uses_partial_index(db_session: AsyncSession, unverified_user: User):
+    plan = await explain(db_session, select(User.id).where(UserService._unverified_condition(datetime.now(timezone.utc))))
+    assert "ix_users_unverified_created_at" in plan, plan
+
+async def test_keyset_listing_uses_primary_key(db_session: AsyncSession, users_with_same_role_50_users):
+    query = select(User.id).where(User.id > uuid.UUID(int=0)).order_by(User.id).limit(10)
+    plan = await explain(db_session, query)
+    assert "users_pkey" in plan, plan
@@ -1,6 +1,7 @@
 from builtins import repr
 from datetime import datetime, timezone
 import pytest
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user_model import User, UserRole
 
@@ -50,7 +51,8 @@ async def test_last_login_update(db_session: AsyncSession, user: User):
     user.last_login_at = new_last_login
     await db_session.commit()
     await db_session.refresh(user)
-    assert user.last_login_at == new_last_login, "Last login timestamp should update correctly"
+    # SQLite returns timezone-aware columns as naive UTC datetimes.
+    assert user.last_login_at.replace(tzinfo=timezone.utc) == new_last_login, "Last login timestamp should update correctly"
 
 @pytest.mark.asyncio
 async def test_account_lock_and_unlock(db_session: AsyncSession, user: User):
@@ -97,7 +99,7 @@ async def test_user_profile_pic_url_update(db_session: AsyncSession, user: User)
     profile_pic_url = "http://myprofile/picture.png"
     user.profile_picture_url = profile_pic_url
     await db_session.commit()
-    await db_session.refresh(user)
+    await db_session.refresh(user.profile)  # Profile fields live in user_profiles
     assert user.profile_picture_url == profile_pic_url, "The profile pic did not update"
 
 @pytest.mark.asyncio
@@ -111,7 +113,7 @@ async def test_user_linkedin_url_update(db_session: AsyncSession, user: User):
     profile_linkedin_url = "http://www.linkedin.com/profile"
     user.linkedin_profile_url = profile_linkedin_url
     await db_session.commit()
-    await db_session.refresh(user)
+    await db_session.refresh(user.profile)
     assert user.linkedin_profile_url == profile_linkedin_url, "The profile pic did not update"
 
 
@@ -126,7 +128,7 @@ async def test_user_github_url_update(db_session: AsyncSession, user: User):
     profile_github_url = "http://www.github.com/profile"
     user.github_profile_url = profile_github_url
     await db_session.commit()
-    await db_session.refresh(user)
+    await db_session.refresh(user.profile)
     assert user.github_profile_url == profile_github_url, "The github did not update"
 
     
@@ -150,3 +152,10 @@ async def test_update_user_role(db_session: AsyncSession, user: User):
     await db_session.commit()
     await db_session.refresh(user)
     assert user.role == UserRole.ADMIN, "Role update should persist correctly in the database"
+
+@pytest.mark.asyncio
+async def test_email_must_be_stored_lowercase(db_session: AsyncSession, user: User):
+    user.email = "Mixed.Case@Example.com"
+    with pytest.raises(IntegrityError):
+        await db_session.commit()
+    await db_session.rollback()
@@ -0,0 +1,80 @@
+from builtins import range
+import logging
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from app.utils.query_instrumentation import QueryTrackingMiddleware, instrument_queries, statement_shape, track_queries
+from tests.conftest import TEST_DATABASE_URL
+
+@pytest.fixture
+async def instrumented_engine():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    instrument_queries(engine, slow_query_threshold_ms=10_000)
+    yield engine
+    await engine.dispose()
+
+def test_statement_shape_ignores_bound_values():
+    assert statement_shape("SELECT * FROM users WHERE id = $1") == statement_shape("SELECT * FROM users WHERE id = $2")
+    assert statement_shape("WHERE id IN ($1, $2, $3)") == statement_shape("WHERE id IN ($1)")
+
+async def test_track_queries_counts_statements(instrumented_engine):
+    with track_queries() as stats:
+        async with instrumented_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+    assert stats.count == 2
+
+async def test_nested_track_queries_count_in_both(instrumented_engine):
+    with track_queries() as outer:
+        async with instrumented_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with track_queries() as inner:
+                await conn.execute(text("SELECT 2"))
+    assert inner.count == 1
+    assert outer.count == 2
+
+async def test_slow_query_logged_with_parameters(caplog):
+    engine = create_async_engine(TEST_DATABASE_URL)
+    instrument_queries(engine, slow_query_threshold_ms=0)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.utils.query_instrumentation"):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT cast(:value as text)"), {"value": "$2b$12$secrethash"})
+    finally:
+        await engine.dispose()
+    assert "Slow query" in caplog.text
+    assert "<redacted>" in caplog.text
+    assert "secrethash" not in caplog.text
+
+async def test_middleware_warns_on_repeated_statement(instrumented_engine, caplog):
+    async def endpoint(request):
+        async with instrumented_engine.connect() as conn:
+            for i in range(4):
+                await conn.execute(text("SELECT cast(:i as int)"), {"i": i})
+        return JSONResponse({})
+
+    app = Starlette(routes=[Route("/loop", endpoint)])
+    app.add_middleware(QueryTrackingMiddleware, threshold=3)
+    with caplog.at_level(logging.WARNING, logger="app.utils.query_instrumentation"):
+        async with AsyncClient(app=app, base_url="http://testserver") as client:
+            await client.get("/loop")
+    assert "Possible N+1" in caplog.text
+    assert "ran 4 times" in caplog.text
+
+async def test_instrument_queries_is_idempotent(caplog):
+    engine = create_async_engine(TEST_DATABASE_URL)
+    instrument_queries(engine, slow_query_threshold_ms=10_000)
+    instrument_queries(engine, slow_query_threshold_ms=0)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.utils.query_instrumentation"):
+            with track_queries() as stats:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+    finally:
+        await engine.dispose()
+    assert stats.count == 1
+    assert caplog.text.count("Slow query") == 1
@@ -0,0 +1,70 @@
+from builtins import range
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.utils.rate_limiter import InMemoryRateLimitBackend, RateLimitMiddleware
+
+async def echo(request: Request):
+    return JSONResponse({"body": (await request.body()).decode()})
+
+@pytest.fixture
+def limited_client(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("LOGIN_RATE_LIMIT_PER_IP", "3")
+    monkeypatch.setenv("LOGIN_RATE_LIMIT_PER_ACCOUNT", "2")
+    app = Starlette(routes=[Route("/login/", echo, methods=["POST"]), Route("/other/", echo, methods=["POST"])])
+    app.add_middleware(RateLimitMiddleware, backend=InMemoryRateLimitBackend())
+    return AsyncClient(app=app, base_url="http://testserver")
+
+async def test_in_memory_backend_sliding_window():
+    backend = InMemoryRateLimitBackend()
+    assert await backend.hit("key", 2, 60) == 0
+    assert await backend.hit("key", 2, 60) == 0
+    assert await backend.hit("key", 2, 60) > 0
+    assert await backend.hit("other", 2, 60) == 0
+
+async def test_in_memory_backend_window_expires():
+    backend = InMemoryRateLimitBackend()
+    assert await backend.hit("key", 1, 0.01) == 0
+    backend._hits["key"][0] -= 1
+    assert await backend.hit("key", 1, 0.01) == 0
+
+async def test_login_limited_per_account(limited_client):
+    form = {"content-type": "application/x-www-form-urlencoded"}
+    for _ in range(2):
+        response = await limited_client.post("/login/", content="username=A@example.com&password=x", headers=form)
+        assert response.status_code == 200
+    response = await limited_client.post("/login/", content="username=a@example.com&password=x", headers=form)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+async def test_login_limited_per_ip(limited_client):
+    for i in range(3):
+        response = await limited_client.post("/login/", data={"username": f"user{i}@example.com", "password": "x"})
+        assert response.status_code == 200
+        assert f"user{i}" in response.json()["body"]
+    response = await limited_client.post("/login/", data={"username": "user9@example.com", "password": "x"})
+    assert response.status_code == 429
+
+async def test_unlimited_path_passes_through(limited_client):
+    for _ in range(5):
+        response = await limited_client.post("/other/", json={"email": "a@example.com"})
+        assert response.status_code == 200
+
+async def test_real_ip_header_ignored_by_default(limited_client):
+    for i in range(3):
+        response = await limited_client.post("/login/", data={"username": f"user{i}@example.com", "password": "x"}, headers={"X-Real-IP": f"10.0.0.{i}"})
+        assert response.status_code == 200
+    # Rotating the header does not buy a fresh per-IP bucket
+    response = await limited_client.post("/login/", data={"username": "user9@example.com", "password": "x"}, headers={"X-Real-IP": "10.0.0.9"})
+    assert response.status_code == 429
+
+async def test_real_ip_header_trusted_when_enabled(limited_client, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_TRUST_PROXY_HEADERS", "true")
+    for i in range(4):
+        response = await limited_client.post("/login/", data={"username": f"user{i}@example.com", "password": "x"}, headers={"X-Real-IP": f"10.0.0.{i}"})
+        assert response.status_code == 200
@@ -0,0 +1,62 @@
+from builtins import Exception
+from contextlib import nullcontext
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.utils.metrics import JOB_FAILURES, JOB_ROWS_AFFECTED
+from app.utils.scheduler import JobScheduler, ScheduledJob
+from tests.conftest import TEST_DATABASE_URL
+
+pytestmark = pytest.mark.asyncio
+
+def counter_value(counter, **labels):
+    return next(
+        (sample.value for metric in counter.collect() for sample in metric.samples
+         if sample.name.endswith("_total") and all(sample.labels.get(k) == v for k, v in labels.items())),
+        0
+    )
+
+@pytest.fixture
+async def lock_engine():
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    yield engine
+    await engine.dispose()
+
+async def test_only_one_scheduler_is_leader(lock_engine):
+    if lock_engine.dialect.name != "postgresql":
+        pytest.skip("Leader election uses PostgreSQL advisory locks; other databases always lead")
+    # A test-only key, so a scheduler started by another test cannot hold it.
+    first = JobScheduler(lock_engine, None, lock_key=4242)
+    second = JobScheduler(lock_engine, None, lock_key=4242)
+    try:
+        assert await first._acquire_leadership() is True
+        assert await second._acquire_leadership() is False
+        assert await first._acquire_leadership() is True
+        await first._release_leadership()
+        assert await second._acquire_leadership() is True
+    finally:
+        await first._release_leadership()
+        await second._release_leadership()
+
+async def test_run_job_records_rows_and_reschedules(db_session):
+    async def job(session):
+        assert session is db_session
+        return 3
+
+    scheduler = JobScheduler(None, lambda: nullcontext(db_session))
+    scheduled = ScheduledJob("test_rows", 60, job)
+    scheduled.next_run = 0
+    before = counter_value(JOB_ROWS_AFFECTED, job="test_rows")
+    scheduler.jobs.append(scheduled)
+    await scheduler.run_due_jobs()
+    assert counter_value(JOB_ROWS_AFFECTED, job="test_rows") == before + 3
+    assert scheduled.next_run > 0
+
+async def test_failing_job_is_counted_and_does_not_raise(db_session):
+    async def job(session):
+        raise Exception("boom")
+
+    scheduler = JobScheduler(None, lambda: nullcontext(db_session))
+    before = counter_value(JOB_FAILURES, job="test_failure")
+    assert await scheduler.run_job(ScheduledJob("test_failure", 60, job)) is None
+    assert counter_value(JOB_FAILURES, job="test_failure") == before + 1
@@ -22,6 +22,10 @@ def test_user_update_valid(user_update_data):
     assert user_update.email == user_update_data["email"]
     assert user_update.first_name == user_update_data["first_name"]
 
+def test_user_update_normalizes_email():
+    assert UserUpdate(email="John.Doe@Example.com").email == "john.doe@example.com"
+    assert UserUpdate(first_name="John").email is None
+
 # Tests for UserResponse
 def test_user_response_valid(user_response_data):
     user = UserResponse(**user_response_data)
@@ -1,7 +1,7 @@
 # test_security.py
 from builtins import RuntimeError, ValueError, isinstance, str
 import pytest
-from app.utils.security import hash_password, verify_password
+from app.utils.security import hash_password, verify_dummy_password, verify_password
 
 def test_hash_password():
     """Test that hashing password returns a bcrypt hashed string."""
@@ -65,3 +65,7 @@ def test_hash_password_internal_error(monkeypatch):
     with pytest.raises(ValueError):
         hash_password("test")
 
+
+def test_verify_dummy_password_always_false():
+    """Test that the dummy check never authenticates."""
+    assert verify_dummy_password("secure_password") is False
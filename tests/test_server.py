@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+from app import server
+from app.database import Database
+
+def test_worker_count_defaults_to_cpus(monkeypatch):
+    monkeypatch.setattr(server, "available_cpus", lambda: 8)
+    assert server.worker_count(0) == 8
+    assert server.worker_count(3) == 3
+
+def test_worker_count_minimum(monkeypatch):
+    monkeypatch.setattr(server, "available_cpus", lambda: 1)
+    assert server.worker_count(0) == 2
+
+def test_gunicorn_options_use_uvicorn_worker():
+    options = server.gunicorn_options()
+    assert options["worker_class"] == "app.server.ProductionUvicornWorker"
+    assert options["max_requests_jitter"] > 0
+    assert options["keepalive"] > 0
+
+def test_forwarded_headers_trusted_only_from_configured_proxies(monkeypatch):
+    assert server.gunicorn_options()["forwarded_allow_ips"] == "127.0.0.1,::1"
+    monkeypatch.setattr(server.settings, "server_forwarded_allow_ips", "172.28.0.10,172.28.0.11")
+    assert server.gunicorn_options()["forwarded_allow_ips"] == "172.28.0.10,172.28.0.11"
+
+def test_post_fork_resets_engine(monkeypatch):
+    engine = MagicMock()
+    monkeypatch.setattr(Database, "_engine", engine)
+    monkeypatch.setattr(Database, "_session_factory", MagicMock())
+    server.post_fork(MagicMock(), MagicMock())
+    engine.sync_engine.dispose.assert_called_once_with(close=False)
+    assert Database._engine is None
+    assert Database._session_factory is None
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select
+from app.models.refresh_token_model import ConsumedRefreshToken
+from app.services.jwt_service import decode_token
+from app.services.token_service import TokenService
+
+pytestmark = pytest.mark.asyncio
+
+# Test that a refresh token rotates into a new pair in the same family
+async def test_rotate_refresh_token(db_session, verified_user):
+    tokens = TokenService.issue_token_pair(verified_user.email, verified_user.role.name)
+    rotated = await TokenService.rotate_refresh_token(db_session, tokens["refresh_token"])
+    assert rotated is not None
+    old_payload = decode_token(tokens["refresh_token"])
+    new_payload = decode_token(rotated["refresh_token"])
+    assert new_payload["fam"] == old_payload["fam"]
+    assert new_payload["jti"] != old_payload["jti"]
+    assert decode_token(rotated["access_token"])["role"] == verified_user.role.name
+
+# Test that reusing a consumed refresh token revokes the whole family
+async def test_refresh_token_reuse_revokes_family(db_session, verified_user):
+    tokens = TokenService.issue_token_pair(verified_user.email, verified_user.role.name)
+    rotated = await TokenService.rotate_refresh_token(db_session, tokens["refresh_token"])
+    assert await TokenService.rotate_refresh_token(db_session, tokens["refresh_token"]) is None
+    assert await TokenService.rotate_refresh_token(db_session, rotated["refresh_token"]) is None
+    family_id = decode_token(tokens["refresh_token"])["fam"]
+    result = await db_session.execute(select(ConsumedRefreshToken).filter_by(family_id=family_id))
+    assert all(row.family_revoked for row in result.scalars().all())
+
+# Test that access tokens cannot be used as refresh tokens
+async def test_rotate_rejects_access_token(db_session, verified_user):
+    tokens = TokenService.issue_token_pair(verified_user.email, verified_user.role.name)
+    assert await TokenService.rotate_refresh_token(db_session, tokens["access_token"]) is None
+
+# Test that locked users cannot refresh
+async def test_rotate_rejects_locked_user(db_session, locked_user):
+    tokens = TokenService.issue_token_pair(locked_user.email, locked_user.role.name)
+    assert await TokenService.rotate_refresh_token(db_session, tokens["refresh_token"]) is None
+
+# Test purging expired consumed tokens
+async def test_purge_expired(db_session, verified_user):
+    db_session.add(ConsumedRefreshToken(jti="expired", family_id="fam", expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)))
+    db_session.add(ConsumedRefreshToken(jti="active", family_id="fam", expires_at=datetime.now(timezone.utc) + timedelta(minutes=1)))
+    await db_session.commit()
+    assert await TokenService.purge_expired(db_session) == 1
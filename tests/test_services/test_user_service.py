@@ -1,11 +1,16 @@
-from builtins import range
+from builtins import any, range
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
 from pydantic import ValidationError
 import pytest
-from sqlalchemy import select
+from sqlalchemy import event, select, update
 from app.dependencies import get_settings
-from app.models.user_model import User
+from app.models.user_model import User, UserRole
+from app.models.user_profile_model import UserProfile
+from app.schemas.user_schemas import UserBulkSelection
 from app.services.user_service import UserService
+from app.utils.security import hash_verification_token
 from fastapi import HTTPException
 
 pytestmark = pytest.mark.asyncio
@@ -170,11 +175,41 @@ async def test_reset_password(db_session, user):
 
 # Test verifying a user's email
 async def test_verify_email_with_token(db_session, user):
-    token = "valid_token_example"  # This should be set in your user setup if it depends on a real token
-    user.verification_token = token  # Simulating setting the token in the database
+    token = "valid_token_example"
+    user.verification_token_hash = hash_verification_token(token)  # Only the hash is stored
     await db_session.commit()
     result = await UserService.verify_email_with_token(db_session, user.id, token)
     assert result is True
+    await db_session.refresh(user)
+    assert user.email_verified is True
+    assert user.verification_token_hash is None
+    # The token is single use
+    assert await UserService.verify_email_with_token(db_session, user.id, token) is False
+
+async def test_verify_email_with_wrong_token(db_session, user):
+    user.verification_token_hash = hash_verification_token("valid_token_example")
+    await db_session.commit()
+    assert await UserService.verify_email_with_token(db_session, user.id, "guessed_token") is False
+    await db_session.refresh(user)
+    assert user.email_verified is False
+
+async def test_verify_email_with_expired_token(db_session, user):
+    token = "valid_token_example"
+    user.verification_token_hash = hash_verification_token(token)
+    user.verification_token_expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    await db_session.commit()
+    assert await UserService.verify_email_with_token(db_session, user.id, token) is False
+
+async def test_create_stores_only_token_hash(db_session, email_service, mocker):
+    mocker.patch.object(email_service, 'send_verification_email', AsyncMock())
+    user_data = {
+        "email": "hashed_token@example.com",
+        "password": "ValidPassword123!",
+    }
+    user = await UserService.create(db_session, user_data, email_service)
+    assert user.verification_token_hash == hash_verification_token(user.verification_token)
+    assert user.verification_token_expires_at is not None
+    assert await UserService.verify_email_with_token(db_session, user.id, user.verification_token) is True
 
 # Test unlocking a user's account
 async def test_unlock_user_account(db_session, locked_user):
@@ -252,3 +287,161 @@ async def test_update_with_no_profile_fields(db_session, user):
     assert updated_user.first_name == "UpdatedOnly"
     assert updated_user.bio == user.bio
     assert updated_user.profile_picture_url == user.profile_picture_url
+
+# Test that a locked account is rejected before any password check
+async def test_authenticate_locked_user(db_session, locked_user, mocker):
+    mock_verify = mocker.patch("app.services.user_service.verify_password")
+    user, is_locked = await UserService.authenticate(db_session, locked_user.email, "MySuperPassword$1234")
+    assert user is None
+    assert is_locked is True
+    mock_verify.assert_not_called()
+
+# Test that an unknown email still pays for a bcrypt check
+async def test_authenticate_unknown_email_runs_dummy_check(db_session, mocker):
+    mock_dummy = mocker.patch("app.services.user_service.verify_dummy_password", return_value=False)
+    user, is_locked = await UserService.authenticate(db_session, "nobody@example.com", "Password123!")
+    assert user is None
+    assert is_locked is False
+    mock_dummy.assert_called_once_with("Password123!")
+
+# Test that a failed login increments the counter in a single update
+async def test_authenticate_failed_login_increments_attempts(db_session, verified_user):
+    await UserService.authenticate(db_session, verified_user.email, "wrongpassword")
+    result = await db_session.execute(select(User.failed_login_attempts).where(User.id == verified_user.id))
+    assert result.scalar() == 1
+
+async def test_get_by_ids(db_session, users_with_same_role_50_users):
+    users = users_with_same_role_50_users
+    missing = uuid4()
+    found = await UserService.get_by_ids(db_session, [users[1].id, missing, users[1].id, users[2].id])
+    assert set(found) == {users[1].id, users[2].id}
+    assert await UserService.get_by_ids(db_session, []) == {}
+
+async def test_bulk_change_role_by_ids_in_chunks(db_session, users_with_same_role_50_users):
+    users = users_with_same_role_50_users
+    selection = UserBulkSelection(ids=[user.id for user in users[:10]])
+    changed = await UserService.bulk_change_role(db_session, selection, UserRole.MANAGER, chunk_size=3)
+    assert set(changed) == {user.id for user in users[:10]}
+    # Users already in the target role are not reported again
+    assert await UserService.bulk_change_role(db_session, selection, UserRole.MANAGER, chunk_size=3) == []
+
+async def test_bulk_lock_by_filter_in_chunks(db_session, users_with_same_role_50_users, admin_user):
+    selection = UserBulkSelection(filter={"role": "AUTHENTICATED", "is_locked": False})
+    locked = await UserService.bulk_set_locked(db_session, selection, locked=True, chunk_size=7)
+    assert len(locked) == 50
+    assert admin_user.id not in locked
+    unlocked = await UserService.bulk_set_locked(db_session, UserBulkSelection(filter={"is_locked": True}), locked=False, chunk_size=7)
+    assert set(unlocked) == set(locked)
+
+async def test_bulk_delete_by_filter(db_session, users_with_same_role_50_users, admin_user):
+    deleted = await UserService.bulk_delete(db_session, UserBulkSelection(filter={"role": "AUTHENTICATED"}), chunk_size=20)
+    assert len(deleted) == 50
+    assert await UserService.count(db_session) == 1
+
+def test_bulk_selection_requires_ids_or_filter():
+    with pytest.raises(ValidationError):
+        UserBulkSelection()
+    with pytest.raises(ValidationError):
+        UserBulkSelection(ids=[uuid4()], filter={"is_locked": True})
+    with pytest.raises(ValidationError):
+        UserBulkSelection(filter={})
+
+async def test_purge_unverified_users(db_session, user, verified_user, admin_user):
+    user.role = UserRole.ANONYMOUS
+    await db_session.commit()
+    cutoff = datetime.now(timezone.utc) + timedelta(minutes=1)
+    assert await UserService.purge_unverified_users(db_session, cutoff - timedelta(days=1), chunk_size=2) == 0
+    assert await UserService.purge_unverified_users(db_session, cutoff, chunk_size=2) == 1
+    assert await UserService.get_by_id(db_session, user.id) is None
+    assert await UserService.get_by_id(db_session, verified_user.id) is not None
+
+async def test_lockout_expires(db_session, verified_user):
+    for _ in range(get_settings().max_login_attempts):
+        await UserService.login_user(db_session, verified_user.email, "wrongpassword")
+    assert await UserService.is_account_locked(db_session, verified_user.email)
+    await db_session.refresh(verified_user)
+    assert verified_user.lockout_count == 1
+    assert verified_user.failed_login_attempts == 0
+    # Let the lock run out
+    await db_session.execute(update(User).where(User.id == verified_user.id).values(locked_until=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    await db_session.commit()
+    assert not await UserService.is_account_locked(db_session, verified_user.email)
+    assert await UserService.login_user(db_session, verified_user.email, "MySuperPassword$1234") is not None
+    await db_session.refresh(verified_user)
+    assert verified_user.lockout_count == 0
+
+async def test_repeated_lockouts_back_off(db_session, verified_user):
+    settings = get_settings()
+    durations = []
+    for _ in range(2):
+        for _ in range(settings.max_login_attempts):
+            await UserService.login_user(db_session, verified_user.email, "wrongpassword")
+        await db_session.refresh(verified_user)
+        # SQLite returns timezone-aware columns as naive UTC datetimes.
+        durations.append(verified_user.locked_until.replace(tzinfo=timezone.utc) - datetime.now(timezone.utc))
+        await db_session.execute(update(User).where(User.id == verified_user.id).values(locked_until=datetime.now(timezone.utc) - timedelta(seconds=1)))
+        await db_session.commit()
+    assert durations[0] > timedelta(minutes=settings.account_lock_minutes - 1)
+    assert durations[1] > timedelta(minutes=2 * settings.account_lock_minutes - 1)
+
+def test_lockout_expiry_is_capped():
+    settings = get_settings()
+    longest = UserService.lockout_expiry(1000) - datetime.now(timezone.utc)
+    assert longest <= timedelta(minutes=settings.account_lock_max_minutes)
+
+async def test_email_lookups_ignore_case(db_session, verified_user):
+    mixed_case = f"  {verified_user.email.upper()} "
+    assert (await UserService.get_by_email(db_session, mixed_case)).id == verified_user.id
+    assert await UserService.login_user(db_session, mixed_case, "MySuperPassword$1234") is not None
+    assert await UserService.is_account_locked(db_session, mixed_case) is False
+
+async def test_authenticate_reads_only_the_users_row(db_session, verified_user):
+    statements = []
+    connection = db_session.bind.sync_connection
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        user, _ = await UserService.authenticate(db_session, verified_user.email, "MySuperPassword$1234")
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+    assert user is not None
+    assert statements and not any("user_profiles" in statement for statement in statements)
+
+async def test_update_creates_missing_profile_and_bumps_updated_at(db_session):
+    user = User(nickname="no_profile", email="no.profile@example.com", hashed_password="x", role=UserRole.AUTHENTICATED)
+    db_session.add(user)
+    await db_session.commit()
+    updated = await UserService.update(db_session, user.id, {"bio": "Now with a bio."}, expected_updated_at=user.updated_at)
+    assert updated.bio == "Now with a bio."
+    assert (await db_session.execute(select(UserProfile.bio).where(UserProfile.user_id == user.id))).scalar() == "Now with a bio."
+
+async def test_delete_removes_profile(db_session, user):
+    assert await UserService.delete(db_session, user.id) is True
+    assert (await db_session.execute(select(UserProfile).where(UserProfile.user_id == user.id))).first() is None
+
+async def test_stats_counts_users_after_refresh(db_session, locked_user, verified_user, admin_user):
+    await UserService.refresh_stats(db_session)
+    stats = await UserService.stats(db_session, days=7)
+    assert stats["total"] == 3
+    assert stats["by_role"] == {"ANONYMOUS": 0, "AUTHENTICATED": 2, "MANAGER": 0, "ADMIN": 1}
+    assert stats["locked"] == 1
+    assert stats["verified"] == sum(1 for u in (locked_user, verified_user, admin_user) if u.email_verified)
+    assert len(stats["signups_per_day"]) == 7
+    assert stats["signups_per_day"][-1] == {"day": datetime.now(timezone.utc).date(), "count": 3}
+    assert stats["refreshed_at"] is not None
+
+async def test_stats_lag_writes_until_refresh(db_session, verified_user):
+    if db_session.bind.dialect.name != "postgresql":
+        pytest.skip("Only the PostgreSQL views are refreshed periodically")
+    await UserService.refresh_stats(db_session)
+    await UserService.delete(db_session, verified_user.id)
+    assert (await UserService.stats(db_session, days=1))["total"] == 1
+    await UserService.refresh_stats(db_session)
+    assert (await UserService.stats(db_session, days=1))["total"] == 0
+
+async def test_update_moves_updated_at_within_one_transaction(db_session, user):
+    first = await UserService.update(db_session, user.id, {"first_name": "First"})
+    first_updated_at = first.updated_at
+    second = await UserService.update(db_session, user.id, {"first_name": "Second"})
+    assert second.updated_at > first_updated_at
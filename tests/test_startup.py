@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from benchmarks.import_profile import measure
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that only specific code paths need and that importing the app must not pull in.
+DEFERRED_MODULES = ["pytest", "markdown2", "smtplib", "email.mime.multipart"]
+
+# Cold import budget for app.main; override with BOOT_TIME_BUDGET_MS on slower CI runners.
+BOOT_TIME_BUDGET_MS = float(os.environ.get("BOOT_TIME_BUDGET_MS", 4000))
+
+def test_app_import_defers_heavy_modules():
+    code = (
+        "import json, sys; import app.main; "
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == []
+
+def test_app_import_does_not_print():
+    completed = subprocess.run([sys.executable, "-c", "import app.main"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert completed.stdout == ""
+
+@pytest.mark.slow
+def test_cold_boot_time_within_budget():
+    report = measure("app.main", runs=3)
+    assert report["import_ms"] < BOOT_TIME_BUDGET_MS, (
+        f"Importing app.main took {report['import_ms']:.0f} ms (budget {BOOT_TIME_BUDGET_MS:.0f} ms); "
+        "run `python -m benchmarks.import_profile` to see which modules grew"
+    )
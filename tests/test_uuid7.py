@@ -0,0 +1,15 @@
+from builtins import len, range, set, sorted
+import time
+from app.utils.uuid7 import uuid7
+
+def test_uuid7_layout():
+    before_ms = time.time_ns() // 1_000_000
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+    assert before_ms <= value.int >> 80 <= time.time_ns() // 1_000_000 + 1
+
+def test_uuid7_strictly_increasing():
+    ids = [uuid7() for _ in range(10_000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)